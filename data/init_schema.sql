@@ -30,7 +30,8 @@ CREATE TABLE IF NOT EXISTS market_data (
     sma_50 DECIMAL(10, 4),
     volume INTEGER,  -- Average daily volume for liquidity check
     is_volatile INTEGER DEFAULT 0,
-    source TEXT CHECK(source IN ('Alpaca', 'Alpaca-Quote', 'YFinance', 'Manual'))
+    source TEXT CHECK(source IN ('Alpaca', 'Alpaca-Quote', 'YFinance', 'Manual')),
+    ts_epoch INTEGER  -- timestamp as Unix seconds, for TTL checks without parsing
 );
 
 -- News Analysis (parsed news with sentiment)
@@ -46,6 +47,13 @@ CREATE TABLE IF NOT EXISTS news_analysis (
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- News Sentiment Cache (Gemini results keyed by article content hash)
+CREATE TABLE IF NOT EXISTS news_sentiment_cache (
+    key TEXT PRIMARY KEY,
+    result_json TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
 -- Strategy Recommendations (AI-generated trade ideas)
 CREATE TABLE IF NOT EXISTS strategy_recommendations (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -159,7 +167,10 @@ CREATE TABLE IF NOT EXISTS orchestrator_runs (
 
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_market_data_symbol ON market_data(symbol, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_market_data_symbol_epoch ON market_data(symbol, ts_epoch DESC);
 CREATE INDEX IF NOT EXISTS idx_news_symbol ON news_analysis(symbol, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_news_timestamp_sentiment ON news_analysis(timestamp, sentiment);
+CREATE INDEX IF NOT EXISTS idx_news_high_urgency ON news_analysis(timestamp DESC) WHERE urgency = 'high';
 CREATE INDEX IF NOT EXISTS idx_holdings_snapshot ON holdings(snapshot_id);
 CREATE INDEX IF NOT EXISTS idx_recommendations_timestamp ON strategy_recommendations(timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_portfolio_timestamp ON portfolio_snapshot(import_timestamp DESC);
@@ -0,0 +1,77 @@
+"""
+Shared setup for the helper scripts.
+
+Resolves the project root once and puts it (and src/) on sys.path so
+scripts can import both `src.*` modules and the top-level agent packages.
+
+Usage (first import in a script):
+    from _bootstrap import PROJECT_ROOT
+
+Scripts that need API keys call load_env(), which reads .env through the
+cached read_env() shared with setup_launchd.py.
+"""
+
+import os
+import pickle
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _path in (os.path.join(PROJECT_ROOT, "src"), PROJECT_ROOT):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+ENV_FILE = os.path.join(PROJECT_ROOT, ".env")
+ENV_CACHE_FILE = os.path.join(PROJECT_ROOT, ".env.cache.pkl")
+
+
+def read_env():
+    """
+    Return the variables defined in .env, parsed by python-dotenv.
+
+    The result (quotes, inline comments and ${VAR} expansion handled
+    exactly as dotenv does) is cached in .env.cache.pkl, keyed on the
+    .env file's mtime and size, so unchanged files are not re-parsed.
+    """
+    try:
+        stat = os.stat(ENV_FILE)
+    except OSError:
+        return {}
+    # Tagged so caches written by an older parser are never reused
+    cache_key = ("dotenv", stat.st_mtime_ns, stat.st_size)
+
+    try:
+        with open(ENV_CACHE_FILE, "rb") as f:
+            cached_key, cached_vars = pickle.load(f)
+        if cached_key == cache_key:
+            return cached_vars
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
+
+    from dotenv import dotenv_values
+    # Keys without a value come back as None; load_dotenv skips them too
+    env_vars = {k: v for k, v in dotenv_values(ENV_FILE).items() if v is not None}
+    _write_env_cache(cache_key, env_vars)
+    return env_vars
+
+
+def _write_env_cache(cache_key, env_vars):
+    """Atomically write the parsed .env cache (owner-only, it holds secrets)."""
+    tmp_path = f"{ENV_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((cache_key, env_vars), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, ENV_CACHE_FILE)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_env():
+    """Populate os.environ from .env without overriding variables already set."""
+    for key, value in read_env().items():
+        os.environ.setdefault(key, value)
@@ -8,14 +8,36 @@ Usage:
 """
 
 import argparse
+import functools
 import sys
-import os
+import textwrap
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _bootstrap  # Puts the project root on sys.path
 
 from src.utils.config import load_config, get_db_path
-from src.agents.trade_advisor import TradeAdvisor
+
+# Color codes
+COLORS = {
+    'PROCEED': '\033[92m',      # Green
+    'CAUTION': '\033[93m',      # Yellow
+    'AVOID': '\033[91m',        # Red
+    'ERROR': '\033[91m',        # Red
+    'MORE_INFO_NEEDED': '\033[94m',  # Blue
+    'RESET': '\033[0m',
+    'BOLD': '\033[1m',
+    'DIM': '\033[2m'
+}
+
+# Response box frame (fixed inner width)
+_WIDTH = 70
+_TOP = '╔' + '═' * _WIDTH + '╗'
+_MID = '╠' + '═' * _WIDTH + '╣'
+_BOT = '╚' + '═' * _WIDTH + '╝'
+_PAD = ' ' * _WIDTH
+_BLANK = '║' + _PAD + '║'
+
+# Truncate an analysis point at a word boundary to fit after the ' • ' prefix
+_shorten_point = functools.partial(textwrap.shorten, width=_WIDTH - 5, placeholder='...')
 
 
 def print_response(response: dict):
@@ -27,74 +49,57 @@ def print_response(response: dict):
     symbol = response.get('symbol')
     action = response.get('action')
     
-    # Color codes
-    COLORS = {
-        'PROCEED': '\033[92m',      # Green
-        'CAUTION': '\033[93m',      # Yellow
-        'AVOID': '\033[91m',        # Red
-        'ERROR': '\033[91m',        # Red
-        'MORE_INFO_NEEDED': '\033[94m',  # Blue
-        'RESET': '\033[0m',
-        'BOLD': '\033[1m',
-        'DIM': '\033[2m'
-    }
-    
     color = COLORS.get(rec, '')
     reset = COLORS['RESET']
     bold = COLORS['BOLD']
     dim = COLORS['DIM']
     
+    # Build the whole frame, then write it once. Slices of pad are clamped
+    # at 0: a negative stop would cut from the end instead of giving ''
+    width = _WIDTH
+    pad = _PAD
+    out = ['']
+    
     # Header
-    width = 70
-    print()
-    print('╔' + '═' * width + '╗')
-    print(f'║{bold} Trade Advisor Response{reset}' + ' ' * (width - 23) + '║')
-    print('╠' + '═' * width + '╣')
+    out.append(_TOP)
+    out.append(f'║{bold} Trade Advisor Response{reset}' + pad[:width - 23] + '║')
+    out.append(_MID)
     
     # Recommendation and confidence
     rec_line = f'║ Recommendation: {color}{bold}{rec}{reset}'
     padding = width - len(f' Recommendation: {rec}') + 1
-    print(rec_line + ' ' * padding + '║')
+    out.append(rec_line + pad[:max(0, padding)] + '║')
     
     conf_pct = f'{confidence * 100:.0f}%' if isinstance(confidence, float) else str(confidence)
     conf_line = f'║ Confidence: {bold}{conf_pct}{reset}'
     padding = width - len(f' Confidence: {conf_pct}') + 1
-    print(conf_line + ' ' * padding + '║')
+    out.append(conf_line + pad[:max(0, padding)] + '║')
     
     if symbol or action:
         detail = f" Symbol: {symbol or 'N/A'}, Intent: {action or 'N/A'}"
-        print(f'║{dim}{detail}{reset}' + ' ' * (width - len(detail)) + '║')
+        out.append(f'║{dim}{detail}{reset}' + pad[:max(0, width - len(detail))] + '║')
     
-    print('╠' + '═' * width + '╣')
+    out.append(_MID)
     
     # Analysis points
-    print(f'║{bold} Analysis:{reset}' + ' ' * (width - 10) + '║')
+    out.append(f'║{bold} Analysis:{reset}' + pad[:width - 10] + '║')
     for point in analysis:
-        # Wrap long lines
-        point_str = f' • {point}'
-        if len(point_str) > width - 2:
-            point_str = point_str[:width - 5] + '...'
-        print(f'║{point_str}' + ' ' * (width - len(point_str)) + '║')
+        point_str = f' • {_shorten_point(str(point))}'
+        out.append(f'║{point_str}' + pad[:max(0, width - len(point_str))] + '║')
     
-    print('║' + ' ' * width + '║')
+    out.append(_BLANK)
     
     # Reasoning
-    print(f'║{bold} Reasoning:{reset}' + ' ' * (width - 11) + '║')
-    
-    # Word wrap reasoning
-    words = reasoning.split()
-    line = ' '
-    for word in words:
-        if len(line) + len(word) + 1 > width - 2:
-            print(f'║{line}' + ' ' * (width - len(line)) + '║')
-            line = ' ' + word
-        else:
-            line += ' ' + word if line != ' ' else word
-    if line.strip():
-        print(f'║{line}' + ' ' * (width - len(line)) + '║')
-    
-    print('╚' + '═' * width + '╝')
-    print()
+    out.append(f'║{bold} Reasoning:{reset}' + pad[:width - 11] + '║')
+    
+    # Word wrap reasoning (long words are broken so they stay inside the frame)
+    for line in textwrap.wrap(reasoning, width=width - 2):
+        out.append(f'║ {line}' + pad[:max(0, width - len(line) - 1)] + '║')
+    
+    out.append(_BOT)
+    out.append('')
+    
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def main():
@@ -143,6 +148,9 @@ Examples:
     # Get database path
     db_path = args.db_path or get_db_path(config)
     
+    # Deferred so --help and missing-key errors don't pay for the agent imports
+    from src.agents.trade_advisor import TradeAdvisor
+    
     # Initialize advisor
     advisor = TradeAdvisor(
         db_path=db_path,
@@ -6,18 +6,17 @@ Verifies that API keys and environment variables are properly set.
 Usage: python scripts/check_config.py
 """
 
+import glob
 import os
 import sys
-from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+# Only used to locate files; nothing is imported from src/
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-def check_env_var(name: str, required: bool = False, fallback_msg: str = "") -> bool:
-    """Check if environment variable is set."""
-    value = os.getenv(name)
+def check_env_var(env: dict, name: str, required: bool = False, fallback_msg: str = "") -> bool:
+    """Check if environment variable is set in the given environment snapshot."""
+    value = env.get(name)
     if value:
         # Mask the key for security
         masked = value[:4] + "..." + value[-4:] if len(value) > 10 else "***"
@@ -31,38 +30,40 @@ def check_env_var(name: str, required: bool = False, fallback_msg: str = "") ->
 
 
 def main():
+    env = os.environ.copy()
+
     print("=" * 60)
     print("Configuration Status Check")
     print("=" * 60)
 
     # Check API Keys
     print("\n📡 API Keys:")
-    gemini_ok = check_env_var("GEMINI_API_KEY", required=True, fallback_msg="Required for AI")
-    check_env_var("ALPACA_API_KEY", fallback_msg="Will use Yahoo Finance")
-    check_env_var("ALPACA_SECRET_KEY", fallback_msg="Required with ALPACA_API_KEY")
-    check_env_var("ALPHA_VANTAGE_API_KEY", fallback_msg="Backup for screener")
-    check_env_var("FINNHUB_API_KEY", fallback_msg="No news analysis")
+    gemini_ok = check_env_var(env, "GEMINI_API_KEY", required=True, fallback_msg="Required for AI")
+    check_env_var(env, "ALPACA_API_KEY", fallback_msg="Will use Yahoo Finance")
+    check_env_var(env, "ALPACA_SECRET_KEY", fallback_msg="Required with ALPACA_API_KEY")
+    check_env_var(env, "ALPHA_VANTAGE_API_KEY", fallback_msg="Backup for screener")
+    check_env_var(env, "FINNHUB_API_KEY", fallback_msg="No news analysis")
 
     # Check Notification Config
     print("\n📧 Notifications:")
-    check_env_var("GMAIL_USER", fallback_msg="No email alerts")
-    check_env_var("GMAIL_APP_PASSWORD", fallback_msg="Required with GMAIL_USER")
-    check_env_var("EMAIL_RECIPIENT", fallback_msg="Required with GMAIL_USER")
-    check_env_var("IMESSAGE_RECIPIENT", fallback_msg="No iMessage alerts")
+    check_env_var(env, "GMAIL_USER", fallback_msg="No email alerts")
+    check_env_var(env, "GMAIL_APP_PASSWORD", fallback_msg="Required with GMAIL_USER")
+    check_env_var(env, "EMAIL_RECIPIENT", fallback_msg="Required with GMAIL_USER")
+    check_env_var(env, "IMESSAGE_RECIPIENT", fallback_msg="No iMessage alerts")
 
     # Check config file
     print("\n📄 Config File:")
-    config_path = project_root / "config" / "config.yaml"
-    if config_path.exists():
+    config_path = os.path.join(PROJECT_ROOT, "config", "config.yaml")
+    if os.path.exists(config_path):
         print(f"  config/config.yaml: ✅ Found")
     else:
         print(f"  config/config.yaml: ❌ Not found")
 
     # Check database
     print("\n🗄️  Database:")
-    db_path = project_root / "data" / "agent.db"
-    if db_path.exists():
-        size = db_path.stat().st_size
+    db_path = os.path.join(PROJECT_ROOT, "data", "agent.db")
+    if os.path.exists(db_path):
+        size = os.path.getsize(db_path)
         print(f"  data/agent.db: ✅ Found ({size:,} bytes)")
     else:
         print(f"  data/agent.db: ⚪ Not initialized")
@@ -70,12 +71,12 @@ def main():
 
     # Check inbox folder
     print("\n📥 Inbox Folder:")
-    inbox_path = project_root / "inbox"
-    if inbox_path.exists():
-        csv_files = list(inbox_path.glob("*.csv"))
+    inbox_path = os.path.join(PROJECT_ROOT, "inbox")
+    if os.path.exists(inbox_path):
+        csv_files = glob.glob(os.path.join(inbox_path, "*.csv"))
         print(f"  inbox/: ✅ Found ({len(csv_files)} CSV files)")
         for f in csv_files[:3]:
-            print(f"     - {f.name}")
+            print(f"     - {os.path.basename(f)}")
         if len(csv_files) > 3:
             print(f"     ... and {len(csv_files) - 3} more")
     else:
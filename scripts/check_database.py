@@ -9,24 +9,27 @@ Options:
   --full    Show all tables with more detail
 """
 
+import os
 import sys
 import sqlite3
 import argparse
-from pathlib import Path
-from datetime import datetime
 
-project_root = Path(__file__).parent.parent
+from _bootstrap import PROJECT_ROOT
 
+# Display icons for recommendation actions and risk approval status
+ACTION_ICONS = {'BUY': "🟢", 'SELL': "🔴"}
+APPROVAL_ICONS = {True: "✅", False: "❌"}
 
-def format_timestamp(ts: str) -> str:
-    """Format timestamp for display."""
-    if not ts:
-        return "N/A"
-    try:
-        dt = datetime.fromisoformat(ts.replace(" ", "T"))
-        return dt.strftime("%Y-%m-%d %H:%M")
-    except:
-        return ts[:16] if len(ts) > 16 else ts
+
+def sql_timestamp(column: str) -> str:
+    """
+    SQL expression formatting a timestamp column for display.
+
+    Cuts the stored text to 'YYYY-MM-DD HH:MM' in SQLite, keeping the
+    wall-clock time as written (strftime() would shift values that carry
+    a UTC offset to UTC). Missing or empty values show as 'N/A'.
+    """
+    return f"COALESCE(NULLIF(substr(replace({column}, 'T', ' '), 1, 16), ''), 'N/A')"
 
 
 def main():
@@ -34,51 +37,118 @@ def main():
     parser.add_argument("--full", action="store_true", help="Show full details")
     args = parser.parse_args()
 
-    db_path = project_root / "data" / "agent.db"
+    db_path = os.path.join(PROJECT_ROOT, "data", "agent.db")
 
-    if not db_path.exists():
+    if not os.path.exists(db_path):
         print("❌ Database not found. Initialize first:")
         print("   sqlite3 data/agent.db < data/init_schema.sql")
         return 1
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    conn = sqlite3.connect(db_path)
+    # Read-only session: serve hot pages from mmap and a larger page cache
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")
     cursor = conn.cursor()
 
-    print("=" * 60)
-    print("Database Status")
-    print("=" * 60)
-
-    # Portfolio Snapshot
-    print("\n📊 PORTFOLIO")
-    print("-" * 40)
-    cursor.execute("""
-        SELECT id, import_timestamp, total_equity, cash_balance
+    # Run every read back-to-back before formatting any output
+    cursor.execute(f"""
+        SELECT id, {sql_timestamp('import_timestamp')}, total_equity, cash_balance
         FROM portfolio_snapshot
         ORDER BY import_timestamp DESC
         LIMIT 1
     """)
     snapshot = cursor.fetchone()
 
+    holdings = []
     if snapshot:
-        print(f"  Latest Snapshot: #{snapshot['id']}")
-        print(f"  Imported: {format_timestamp(snapshot['import_timestamp'])}")
-        print(f"  Total Equity: ${snapshot['total_equity']:,.2f}")
-        print(f"  Cash Balance: ${snapshot['cash_balance']:,.2f}")
-
         cursor.execute("""
             SELECT symbol, quantity, current_value
             FROM holdings
             WHERE snapshot_id = ?
             ORDER BY current_value DESC
-        """, (snapshot['id'],))
+        """, (snapshot[0],))
         holdings = cursor.fetchall()
+
+    # Latest recommendations and risk decisions in one query, tagged by kind
+    cursor.execute(f"""
+        SELECT * FROM (
+            SELECT 'rec', symbol, action, confidence, reasoning,
+                   {sql_timestamp('timestamp')}
+            FROM strategy_recommendations
+            ORDER BY timestamp DESC
+            LIMIT 5
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'risk', symbol, action, approved, reason,
+                   {sql_timestamp('timestamp')}
+            FROM risk_decisions
+            ORDER BY timestamp DESC
+            LIMIT 5
+        )
+    """)
+    recs = []
+    decisions = []
+    for kind, *row in cursor.fetchall():
+        (recs if kind == 'rec' else decisions).append(row)
+
+    cursor.execute(f"""
+        SELECT symbol, source, rank, {sql_timestamp('screening_timestamp')},
+               COUNT(*) OVER () AS total_rows
+        FROM screener_results
+        ORDER BY rank
+        LIMIT 10
+    """)
+    screened = cursor.fetchall()
+    total_screened = screened[0][4] if screened else 0
+
+    # News and market cache aggregates in a single round-trip
+    cursor.execute(f"""
+        WITH news AS (
+            SELECT COUNT(*) as total,
+                   COUNT(*) FILTER (WHERE sentiment = 'positive') as positive,
+                   COUNT(*) FILTER (WHERE sentiment = 'negative') as negative,
+                   COUNT(*) FILTER (WHERE sentiment = 'neutral') as neutral
+            FROM news_analysis
+            WHERE timestamp > datetime('now', '-24 hours')
+        ),
+        market AS (
+            SELECT COUNT(DISTINCT symbol) as symbols,
+                   MAX(timestamp) as latest
+            FROM market_data
+            WHERE timestamp > datetime('now', '-1 hour')
+        )
+        SELECT news.total, news.positive, news.negative, news.neutral,
+               market.symbols, {sql_timestamp('market.latest')}
+        FROM news, market
+    """)
+    summary = cursor.fetchone()
+    news = summary[:4]
+    market = summary[4:]
+
+    conn.close()
+
+    print("=" * 60)
+    print("Database Status")
+    print("=" * 60)
+
+    # Portfolio Snapshot
+    print("\n📊 PORTFOLIO")
+    print("-" * 40)
+
+    if snapshot:
+        snapshot_id, import_timestamp, total_equity, cash_balance = snapshot
+        print(f"  Latest Snapshot: #{snapshot_id}")
+        print(f"  Imported: {import_timestamp}")
+        print(f"  Total Equity: ${total_equity:,.2f}")
+        print(f"  Cash Balance: ${cash_balance:,.2f}")
         print(f"  Holdings: {len(holdings)} positions")
 
         if args.full and holdings:
             print()
-            for h in holdings:
-                print(f"    {h['symbol']:<6} {h['quantity']:>8,.2f} shares  ${h['current_value']:>10,.2f}")
+            for symbol, quantity, current_value in holdings:
+                print(f"    {symbol:<6} {quantity:>8,.2f} shares  ${current_value:>10,.2f}")
     else:
         print("  ⚪ No portfolio imported yet")
         print("     Run: python scripts/import_portfolio.py")
@@ -86,23 +156,16 @@ def main():
     # Strategy Recommendations
     print("\n🎯 RECOMMENDATIONS")
     print("-" * 40)
-    cursor.execute("""
-        SELECT symbol, action, confidence, reasoning, timestamp
-        FROM strategy_recommendations
-        ORDER BY timestamp DESC
-        LIMIT 5
-    """)
-    recs = cursor.fetchall()
 
     if recs:
         print(f"  Recent: {len(recs)} (showing last 5)")
         print()
-        for r in recs:
-            action_icon = "🟢" if r['action'] == 'BUY' else "🔴" if r['action'] == 'SELL' else "⚪"
-            conf = f"{r['confidence']*100:.0f}%" if r['confidence'] else "N/A"
-            print(f"    {action_icon} {r['symbol']:<6} {r['action']:<4} {conf:>4}  {format_timestamp(r['timestamp'])}")
-            if args.full and r['reasoning']:
-                reason = r['reasoning'][:60] + "..." if len(r['reasoning']) > 60 else r['reasoning']
+        for symbol, action, confidence, reasoning, timestamp in recs:
+            action_icon = ACTION_ICONS.get(action, "⚪")
+            conf = f"{confidence*100:.0f}%" if confidence else "N/A"
+            print(f"    {action_icon} {symbol:<6} {action:<4} {conf:>4}  {timestamp}")
+            if args.full and reasoning:
+                reason = reasoning[:60] + "..." if len(reasoning) > 60 else reasoning
                 print(f"       └─ {reason}")
     else:
         print("  ⚪ No recommendations yet")
@@ -111,44 +174,28 @@ def main():
     # Risk Decisions
     print("\n🛡️  RISK DECISIONS")
     print("-" * 40)
-    cursor.execute("""
-        SELECT symbol, action, approved, reason, timestamp
-        FROM risk_decisions
-        ORDER BY timestamp DESC
-        LIMIT 5
-    """)
-    decisions = cursor.fetchall()
 
     if decisions:
-        approved_count = sum(1 for d in decisions if d['approved'])
+        approved_count = sum(1 for d in decisions if d[2])
         print(f"  Recent: {len(decisions)} ({approved_count} approved)")
         print()
-        for d in decisions:
-            status = "✅" if d['approved'] else "❌"
-            reason = d['reason'][:40] + "..." if len(d['reason']) > 40 else d['reason']
-            print(f"    {status} {d['symbol']:<6} {d['action']:<4} {reason}")
+        for symbol, action, approved, reason, _ in decisions:
+            status = APPROVAL_ICONS[bool(approved)]
+            reason = reason[:40] + "..." if len(reason) > 40 else reason
+            print(f"    {status} {symbol:<6} {action:<4} {reason}")
     else:
         print("  ⚪ No risk decisions yet")
 
     # Screener Results
     print("\n🔍 SCREENER")
     print("-" * 40)
-    cursor.execute("""
-        SELECT symbol, source, rank, screening_timestamp
-        FROM screener_results
-        ORDER BY rank
-        LIMIT 10
-    """)
-    screened = cursor.fetchall()
 
     if screened:
-        cursor.execute("SELECT COUNT(*) FROM screener_results")
-        total = cursor.fetchone()[0]
-        print(f"  Cached: {total} symbols (top 10 shown)")
-        print(f"  Source: {screened[0]['source'] if screened else 'N/A'}")
-        print(f"  Updated: {format_timestamp(screened[0]['screening_timestamp']) if screened else 'N/A'}")
+        print(f"  Cached: {total_screened} symbols (top 10 shown)")
+        print(f"  Source: {screened[0][1] if screened else 'N/A'}")
+        print(f"  Updated: {screened[0][3] if screened else 'N/A'}")
         print()
-        symbols = [s['symbol'] for s in screened]
+        symbols = [s[0] for s in screened]
         print(f"    Top 10: {', '.join(symbols)}")
     else:
         print("  ⚪ No screening results cached")
@@ -157,44 +204,28 @@ def main():
     # News Analysis
     print("\n📰 NEWS ANALYSIS")
     print("-" * 40)
-    cursor.execute("""
-        SELECT COUNT(*) as total,
-               SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive,
-               SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) as negative,
-               SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) as neutral
-        FROM news_analysis
-        WHERE timestamp > datetime('now', '-24 hours')
-    """)
-    news = cursor.fetchone()
 
-    if news and news['total'] > 0:
-        print(f"  Last 24h: {news['total']} articles analyzed")
-        print(f"    🟢 Positive: {news['positive']}")
-        print(f"    🔴 Negative: {news['negative']}")
-        print(f"    ⚪ Neutral: {news['neutral']}")
+    if news[0] > 0:
+        total, positive, negative, neutral = news
+        print(f"  Last 24h: {total} articles analyzed")
+        print(f"    🟢 Positive: {positive}")
+        print(f"    🔴 Negative: {negative}")
+        print(f"    ⚪ Neutral: {neutral}")
     else:
         print("  ⚪ No news analyzed in last 24h")
 
     # Market Data Cache
     print("\n📈 MARKET DATA CACHE")
     print("-" * 40)
-    cursor.execute("""
-        SELECT COUNT(DISTINCT symbol) as symbols,
-               MAX(timestamp) as latest
-        FROM market_data
-        WHERE timestamp > datetime('now', '-1 hour')
-    """)
-    market = cursor.fetchone()
 
-    if market and market['symbols'] > 0:
-        print(f"  Symbols cached (last hour): {market['symbols']}")
-        print(f"  Latest update: {format_timestamp(market['latest'])}")
+    if market[0] > 0:
+        symbol_count, latest = market
+        print(f"  Symbols cached (last hour): {symbol_count}")
+        print(f"  Latest update: {latest}")
     else:
         print("  ⚪ No recent market data cached")
         print("     Run: python scripts/test_market_data.py")
 
-    conn.close()
-
     print("\n" + "=" * 60)
     return 0
 
@@ -3,13 +3,11 @@
 Clear previous strategy recommendations.
 Useful when algorithm logic changes and old recommendations are invalid.
 """
-import os
 import sys
 
-# Add project root to path for imports
-sys.path.insert(0, os.getcwd())
+import _bootstrap  # Puts the project root on sys.path
 
-from src.data.db_connection import get_connection
+from src.data.db_connection import get_connection, get_db_mode
 from src.utils.config import get_db_path
 
 def clear_recommendations():
@@ -19,23 +17,21 @@ def clear_recommendations():
     
     try:
         with get_connection(db_path) as conn:
-            cursor = conn.cursor()
+            if get_db_mode() == 'local':
+                # WAL + NORMAL sync: one fsync at commit instead of per journal write
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("BEGIN IMMEDIATE")
             
-            # Count before
-            cursor.execute("SELECT COUNT(*) FROM strategy_recommendations")
-            count_before = cursor.fetchone()[0]
+            cursor = conn.cursor()
             
-            # Delete
+            # rowcount after DELETE gives the number of removed rows
             cursor.execute("DELETE FROM strategy_recommendations")
-            
-            # Count after
-            cursor.execute("SELECT COUNT(*) FROM strategy_recommendations")
-            count_after = cursor.fetchone()[0]
+            deleted = cursor.rowcount
             
             conn.commit()
             
-            print(f"Deleted {count_before} recommendations.")
-            print(f"Remaining: {count_after}")
+            print(f"Deleted {deleted} recommendations.")
             
     except Exception as e:
         print(f"Error: {e}")
@@ -10,39 +10,48 @@ If no path provided, imports the most recent CSV from inbox/.
 
 import sys
 import os
-from pathlib import Path
 from datetime import datetime
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+from _bootstrap import PROJECT_ROOT
 
 from agents.portfolio_accountant import PortfolioAccountant
 
 
-def find_latest_csv(inbox_dir: Path) -> Path:
+def find_latest_csv(inbox_dir: str) -> str:
     """Find the most recently modified CSV in inbox."""
-    csv_files = list(inbox_dir.glob("*.csv"))
-    if not csv_files:
+    latest = None
+    latest_mtime = -1.0
+    try:
+        # scandir entries carry cached stat info, avoiding a stat() per file
+        with os.scandir(inbox_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".csv") and entry.is_file():
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest, latest_mtime = entry.path, mtime
+    except FileNotFoundError:
         return None
-    return max(csv_files, key=lambda f: f.stat().st_mtime)
+    return latest
 
 
 def main():
-    db_path = project_root / "data" / "agent.db"
-    inbox_dir = project_root / "inbox"
+    db_path = os.path.join(PROJECT_ROOT, "data", "agent.db")
+    inbox_dir = os.path.join(PROJECT_ROOT, "inbox")
 
     # Check database exists
-    if not db_path.exists():
+    if not os.path.exists(db_path):
         print("❌ Database not found. Initialize first:")
         print("   sqlite3 data/agent.db < data/init_schema.sql")
         return 1
 
     # Determine CSV file to import
     if len(sys.argv) > 1:
-        csv_path = Path(sys.argv[1])
-        if not csv_path.is_absolute():
-            csv_path = project_root / csv_path
+        csv_path = sys.argv[1]
+        if not os.path.isabs(csv_path):
+            csv_path = os.path.join(PROJECT_ROOT, csv_path)
+        if not os.path.exists(csv_path):
+            print(f"❌ File not found: {csv_path}")
+            return 1
     else:
         csv_path = find_latest_csv(inbox_dir)
         if not csv_path:
@@ -50,19 +59,15 @@ def main():
             print("   Drop a Fidelity CSV export into the inbox/ folder")
             print("   Or specify a path: python scripts/import_portfolio.py path/to/file.csv")
             return 1
-        print(f"📄 Using most recent CSV: {csv_path.name}")
-
-    if not csv_path.exists():
-        print(f"❌ File not found: {csv_path}")
-        return 1
+        print(f"📄 Using most recent CSV: {os.path.basename(csv_path)}")
 
     # Import the CSV
     print(f"\n📥 Importing: {csv_path}")
     print("-" * 50)
 
     try:
-        pa = PortfolioAccountant(str(db_path))
-        snapshot_id = pa.import_fidelity_csv(str(csv_path))
+        pa = PortfolioAccountant(db_path)
+        snapshot_id = pa.import_fidelity_csv(csv_path)
 
         if snapshot_id:
             snapshot = pa.get_latest_snapshot()
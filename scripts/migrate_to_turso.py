@@ -7,11 +7,9 @@ Usage:
 import os
 import sqlite3
 import logging
-import sys
 from dotenv import load_dotenv
 
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _bootstrap import PROJECT_ROOT
 
 # Initialize logging
 logging.basicConfig(
@@ -23,10 +21,13 @@ logger = logging.getLogger(__name__)
 # Load env variables
 load_dotenv()
 
-LOCAL_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'agent.db')
+LOCAL_DB_PATH = os.path.join(PROJECT_ROOT, 'data', 'agent.db')
 TURSO_URL = os.environ.get('TURSO_DATABASE_URL')
 TURSO_TOKEN = os.environ.get('TURSO_AUTH_TOKEN')
 
+# Rows fetched from the local DB and sent to Turso per executemany call
+BATCH_SIZE = 5000
+
 def migrate():
     # Validation
     if not os.path.exists(LOCAL_DB_PATH):
@@ -77,23 +78,30 @@ def migrate():
             except Exception as e:
                 logger.warning(f"  -> Table creation note: {e}")
 
-            # 2. Copy data
-            local_cursor.execute(f"SELECT * FROM {table_name}")
-            rows = local_cursor.fetchall()
+            # 2. Copy data in chunks so memory stays bounded for large tables
+            quoted_name = '"' + table_name.replace('"', '""') + '"'
+            local_cursor.execute(f"SELECT * FROM {quoted_name}")
+            col_count = len(local_cursor.description)
+            placeholders = ', '.join(['?'] * col_count)
+            insert_sql = f"INSERT OR REPLACE INTO {quoted_name} VALUES ({placeholders})"
             
-            if rows:
-                col_count = len(rows[0])
-                placeholders = ', '.join(['?'] * col_count)
-                insert_sql = f"INSERT OR REPLACE INTO {table_name} VALUES ({placeholders})"
-                
-                try:
+            migrated = 0
+            try:
+                while True:
+                    rows = local_cursor.fetchmany(BATCH_SIZE)
+                    if not rows:
+                        break
                     turso_conn.executemany(insert_sql, rows)
+                    migrated += len(rows)
+                
+                if migrated:
                     turso_conn.commit()
-                    logger.info(f"  -> Migrated {len(rows)} rows")
-                except Exception as e:
-                    logger.error(f"  -> Failed to migrate data: {e}")
-            else:
-                logger.info("  -> Table is empty")
+                    logger.info(f"  -> Migrated {migrated} rows")
+                else:
+                    logger.info("  -> Table is empty")
+            except Exception as e:
+                turso_conn.rollback()
+                logger.error(f"  -> Failed to migrate data: {e}")
 
     except Exception as e:
         logger.error(f"Migration failed during execution: {e}")
@@ -8,18 +8,16 @@ while preserving market data, cached news, and other configuration.
 Usage: python scripts/reset_portfolio.py
 """
 
+import os
 import sys
 import sqlite3
-from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+from _bootstrap import PROJECT_ROOT
 
 def main():
-    db_path = project_root / "data" / "agent.db"
+    db_path = os.path.join(PROJECT_ROOT, "data", "agent.db")
     
-    if not db_path.exists():
+    if not os.path.exists(db_path):
         print(f"❌ Database not found at {db_path}")
         return 1
 
@@ -43,6 +41,10 @@ def main():
         
     try:
         conn = sqlite3.connect(db_path)
+        # WAL + NORMAL sync and a single transaction: one fsync for all deletions
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("BEGIN IMMEDIATE")
         cursor = conn.cursor()
         
         # Execute deletions
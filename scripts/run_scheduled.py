@@ -6,32 +6,73 @@ Usage:
     python scripts/run_scheduled.py premarket
     python scripts/run_scheduled.py market
     python scripts/run_scheduled.py postmarket
+
+Environment variables are expected from the scheduler (e.g. systemd
+EnvironmentFile=/path/to/.env or Railway variables). This script does
+not load .env itself; src.utils.config and src.data.db_connection load
+it when they are imported. That includes skipped days, since logging
+the skipped run imports db_connection (DB_MODE may come from .env).
 """
 import os
 import sys
 from datetime import date
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from dotenv import load_dotenv
-load_dotenv()
+from _bootstrap import PROJECT_ROOT
+
+
+# NYSE full-day closures (weekday holidays), generated from
+# pandas_market_calendars. Years outside this table fall back to the
+# calendar library. Early-close days count as open.
+NYSE_HOLIDAYS_YEARS = range(2025, 2031)
+NYSE_HOLIDAYS = frozenset([
+    # 2025
+    date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17),
+    date(2025, 4, 18), date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4),
+    date(2025, 9, 1), date(2025, 11, 27), date(2025, 12, 25),
+    # 2026
+    date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3),
+    date(2026, 5, 25), date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7),
+    date(2026, 11, 26), date(2026, 12, 25),
+    # 2027
+    date(2027, 1, 1), date(2027, 1, 18), date(2027, 2, 15), date(2027, 3, 26),
+    date(2027, 5, 31), date(2027, 6, 18), date(2027, 7, 5), date(2027, 9, 6),
+    date(2027, 11, 25), date(2027, 12, 24),
+    # 2028
+    date(2028, 1, 17), date(2028, 2, 21), date(2028, 4, 14), date(2028, 5, 29),
+    date(2028, 6, 19), date(2028, 7, 4), date(2028, 9, 4), date(2028, 11, 23),
+    date(2028, 12, 25),
+    # 2029
+    date(2029, 1, 1), date(2029, 1, 15), date(2029, 2, 19), date(2029, 3, 30),
+    date(2029, 5, 28), date(2029, 6, 19), date(2029, 7, 4), date(2029, 9, 3),
+    date(2029, 11, 22), date(2029, 12, 25),
+    # 2030
+    date(2030, 1, 1), date(2030, 1, 21), date(2030, 2, 18), date(2030, 4, 19),
+    date(2030, 5, 27), date(2030, 6, 19), date(2030, 7, 4), date(2030, 9, 2),
+    date(2030, 11, 28), date(2030, 12, 25),
+])
 
 
 def is_market_open_today() -> bool:
     """Check if US stock market is open today."""
+    today = date.today()
+    if today.weekday() >= 5:
+        return False
+
+    # Static table avoids importing pandas on every scheduled run
+    if today.year in NYSE_HOLIDAYS_YEARS:
+        return today not in NYSE_HOLIDAYS
+
     try:
         import pandas_market_calendars as mcal
 
         nyse = mcal.get_calendar('NYSE')
-        today = date.today()
         schedule = nyse.schedule(start_date=today, end_date=today)
 
         return len(schedule) > 0
 
     except ImportError:
-        # Fallback: just check if it's a weekday
-        return date.today().weekday() < 5  # Mon-Fri
+        # Fallback: weekday already checked above
+        return True
 
 
 def log_run(mode: str, status: str, error_message: str = None):
@@ -39,7 +80,7 @@ def log_run(mode: str, status: str, error_message: str = None):
     try:
         from src.data.db_connection import get_connection
 
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'agent.db')
+        db_path = os.path.join(PROJECT_ROOT, 'data', 'agent.db')
 
         with get_connection(db_path) as conn:
             cursor = conn.cursor()
@@ -3,7 +3,7 @@
 Run Trading System
 
 Convenience wrapper to run the main orchestrator with common options.
-Usage: python scripts/run_system.py [MODE]
+Usage: python scripts/run_system.py [MODE] [--subprocess]
 
 Modes:
   premarket   - Morning scan (safe, no recommendations)
@@ -11,19 +11,29 @@ Modes:
   postmarket  - Daily summary email
   review      - Portfolio review (explicit sell consideration for holdings)
   auto        - Auto-detect based on time (default)
+
+The orchestrator runs inside this interpreter; pass --subprocess to
+exec it as a separate program instead.
 """
 
 import sys
 import os
-import subprocess
 from pathlib import Path
 
-project_root = Path(__file__).parent.parent
+from _bootstrap import PROJECT_ROOT, load_env
+
+project_root = Path(PROJECT_ROOT)
+
+# Loaded here so the orchestrator (in-process or exec'd) sees it
+load_env()
 
 
 def main():
     # Determine mode
-    mode = sys.argv[1] if len(sys.argv) > 1 else "auto"
+    args = sys.argv[1:]
+    use_subprocess = "--subprocess" in args
+    args = [a for a in args if a != "--subprocess"]
+    mode = args[0] if args else "auto"
 
     valid_modes = ["premarket", "market", "postmarket", "review", "auto"]
     if mode not in valid_modes:
@@ -49,10 +59,23 @@ def main():
     print("=" * 60)
     print()
 
-    # Run the orchestrator
+    os.chdir(str(project_root))
+
+    if use_subprocess:
+        # Replace this process with the orchestrator (no fork, no second
+        # interpreter waiting on it); the exit code is the orchestrator's own
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(cmd[0], cmd)
+
+    # Run in this interpreter: no second Python start-up or re-import of
+    # the agents. The orchestrator parses sys.argv itself.
+    sys.argv = cmd[1:]
+    from main_orchestrator import main as orchestrator_main
     try:
-        result = subprocess.run(cmd, cwd=str(project_root))
-        return result.returncode
+        return orchestrator_main()
+    except SystemExit as e:
+        return e.code
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
         return 130
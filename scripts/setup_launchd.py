@@ -19,30 +19,18 @@ import shutil
 import subprocess
 from pathlib import Path
 
+from _bootstrap import read_env
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
-ENV_FILE = PROJECT_ROOT / ".env"
 PLIST_TEMPLATE = PROJECT_ROOT / "launchd" / "com.shengpeng.stockagent.plist"
 PLIST_DEST = Path.home() / "Library" / "LaunchAgents" / "com.shengpeng.stockagent.plist"
 LABEL = "com.shengpeng.stockagent"
 
 
 def load_env():
-    """Load environment variables from .env file."""
-    env_vars = {}
-    if ENV_FILE.exists():
-        with open(ENV_FILE) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    # Handle export VAR=value or VAR=value
-                    if line.startswith('export '):
-                        line = line[7:]
-                    key, _, value = line.partition('=')
-                    # Remove quotes
-                    value = value.strip().strip('"').strip("'")
-                    env_vars[key.strip()] = value
-    return env_vars
+    """Load environment variables from .env (cached, see _bootstrap.read_env)."""
+    return read_env()
 
 
 def create_plist_with_keys(env_vars):
@@ -5,16 +5,21 @@ Sync database between Turso cloud and local SQLite.
 Usage:
     python scripts/sync_db.py --backup   # Cloud → Local (backup)
     python scripts/sync_db.py --restore  # Local → Cloud (restore)
+
+Tables whose contents match the previous sync on both sides (row count,
+max rowid and a checksum of every row) are skipped; pass --force to copy
+everything regardless.
 """
 import os
 import sys
+import json
+import hashlib
 import sqlite3
 import argparse
 import logging
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from _bootstrap import PROJECT_ROOT, load_env
 
 # Initialize logging
 logging.basicConfig(
@@ -24,12 +29,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Load env variables
-load_dotenv()
+load_env()
+
+LOCAL_DB_PATH = os.path.join(PROJECT_ROOT, 'data', 'agent.db')
+SYNC_STATE_PATH = os.path.join(PROJECT_ROOT, 'data', '.sync_state.json')
 
-LOCAL_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'agent.db')
+# libsql embedded replica of Turso; kept between runs so each backup only
+# pulls the frames written since the previous one
+REPLICA_DB_PATH = os.path.join(PROJECT_ROOT, 'data', '.turso_replica.db')
 TURSO_URL = os.environ.get('TURSO_DATABASE_URL')
 TURSO_TOKEN = os.environ.get('TURSO_AUTH_TOKEN')
 
+# Tables synced concurrently (one connection pair per worker)
+SYNC_WORKERS = 8
+
+# Rows fetched from the source and inserted per executemany call
+INSERT_BATCH_SIZE = 10_000
+
+# Rows packed into one multi-row INSERT when the target is Turso,
+# bounded by SQLite's host parameter limit
+TURSO_ROWS_PER_STATEMENT = 500
+MAX_SQL_VARIABLES = 32766
+
+# Prepared-statement cache size for local connections; must cover every
+# table's SELECT/DELETE/INSERT so none get evicted mid-sync
+LOCAL_CACHED_STATEMENTS = 256
+
+# (table, col_count) -> (select_sql, delete_sql, insert_sql)
+_SQL_CACHE: dict[tuple[str, int], tuple[str, str, str]] = {}
+
 
 def get_turso_connection():
     """Connect to Turso cloud database."""
@@ -45,53 +73,379 @@ def get_turso_connection():
 
 
 def get_local_connection():
-    """Connect to local SQLite database."""
+    """Connect to local SQLite database, tuned for bulk writes."""
     try:
-        return sqlite3.connect(LOCAL_DB_PATH)
+        conn = sqlite3.connect(LOCAL_DB_PATH, timeout=60,
+                               cached_statements=LOCAL_CACHED_STATEMENTS)
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-262144;
+        """)
+        return conn
     except Exception as e:
         logger.error(f"Failed to connect to local DB: {e}")
         sys.exit(1)
 
 
 def get_tables(conn):
-    """Get list of user tables from database."""
+    """
+    Get user tables and their column counts from database.
+
+    One query covers the whole schema, so Turso pays a single round-trip.
+    Returns a dict of {table_name: column_count}.
+    """
     cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    return [row[0] for row in cursor.fetchall()]
+    cursor.execute("""
+        SELECT name, (SELECT COUNT(*) FROM pragma_table_info(m.name))
+        FROM sqlite_master m
+        WHERE type='table' AND name NOT LIKE 'sqlite_%'
+    """)
+    return dict(cursor.fetchall())
+
+
+def _table_sql(table_name, col_count):
+    """
+    Return the (select, delete, insert) statements for a table.
+
+    Built once per (table, col_count) so repeated syncs reuse identical SQL
+    text, which is what SQLite's statement cache keys on.
+    """
+    key = (table_name, col_count)
+    sql = _SQL_CACHE.get(key)
+    if sql is None:
+        placeholders = ', '.join(['?'] * col_count)
+        sql = (
+            f"SELECT * FROM {table_name}",
+            f"DELETE FROM {table_name}",
+            f"INSERT INTO {table_name} VALUES ({placeholders})",
+        )
+        _SQL_CACHE[key] = sql
+    return sql
+
+
+def sync_table(source_conn, target_conn, table_name, col_count=None):
+    """
+    Sync a single table from source to target (replace mode).
+
+    Returns the number of rows copied, or None if the table could not be
+    cleared or filled (the target's transaction is rolled back).
+    """
+    source_cursor = source_conn.cursor()
 
+    # Stream data from source; without a cached schema the column count
+    # comes from the result description
+    if col_count is None:
+        source_cursor.execute(f"SELECT * FROM {table_name}")
+        col_count = len(source_cursor.description)
+    else:
+        source_cursor.execute(_table_sql(table_name, col_count)[0])
 
-def sync_table(source_conn, target_conn, table_name):
-    """Sync a single table from source to target (replace mode)."""
-    source_cursor = source_conn.cursor()
-    target_cursor = target_conn.cursor()
+    if isinstance(target_conn, sqlite3.Connection):
+        return _sync_into_local(source_cursor, target_conn, table_name, col_count)
+    return _sync_into_turso(source_cursor, target_conn, table_name, col_count)
 
-    # Get data from source
-    source_cursor.execute(f"SELECT * FROM {table_name}")
-    rows = source_cursor.fetchall()
+
+def _sync_into_local(source_cursor, target_conn, table_name, col_count):
+    """
+    Replace a local table with the rows streaming from source_cursor.
+
+    The rows are staged in a TEMP table first, which lives on this
+    connection only and takes no lock on the database file. The shared
+    write lock (BEGIN IMMEDIATE) is held just for the DELETE + INSERT ...
+    SELECT swap, not while rows arrive from Turso, so the other workers'
+    swaps can interleave with this table's download.
+    """
+    _, delete_sql, _ = _table_sql(table_name, col_count)
+    stage = f"temp.sync_stage_{table_name}"
+    placeholders = ', '.join(['?'] * col_count)
+
+    try:
+        target_conn.execute(f"DROP TABLE IF EXISTS {stage}")
+        target_conn.execute(f"CREATE TABLE {stage} AS SELECT * FROM main.{table_name} WHERE 0")
+        total = 0
+        while True:
+            chunk = source_cursor.fetchmany(INSERT_BATCH_SIZE)
+            if not chunk:
+                break
+            target_conn.executemany(f"INSERT INTO {stage} VALUES ({placeholders})", chunk)
+            total += len(chunk)
+        target_conn.commit()
+    except Exception as e:
+        logger.error(f"  Failed to stage {table_name}: {e}")
+        target_conn.rollback()
+        return None
+
+    try:
+        # Waits on the busy timeout while another table holds the write lock
+        target_conn.execute("BEGIN IMMEDIATE")
+        target_conn.execute(delete_sql)
+        target_conn.execute(f"INSERT INTO main.{table_name} SELECT * FROM {stage}")
+    except Exception as e:
+        logger.error(f"  Failed to replace {table_name}: {e}")
+        # Don't leave the table cleared when the copy failed
+        target_conn.rollback()
+        return None
+
+    # The TEMP stage goes away with the connection
+    return total
+
+
+def _sync_into_turso(source_cursor, target_conn, table_name, col_count):
+    """Replace a Turso table with the rows streaming from source_cursor."""
+    _, delete_sql, _ = _table_sql(table_name, col_count)
+    target_cursor = target_conn.cursor()
 
     # Clear target table
     try:
-        target_cursor.execute(f"DELETE FROM {table_name}")
+        target_cursor.execute(delete_sql)
     except Exception as e:
         logger.warning(f"  Could not clear {table_name}: {e}")
-        return 0
+        target_conn.rollback()
+        return None
 
-    # Insert data into target
-    if rows:
-        col_count = len(rows[0])
-        placeholders = ', '.join(['?'] * col_count)
-        insert_sql = f"INSERT INTO {table_name} VALUES ({placeholders})"
+    # Turso sends one request per statement, so pack many rows into each
+    # INSERT instead of using executemany (one statement per row)
+    rows_per_stmt = max(1, min(TURSO_ROWS_PER_STATEMENT, MAX_SQL_VARIABLES // col_count))
+    row_values = f"({', '.join(['?'] * col_count)})"
+
+    # Insert data into target chunk by chunk, so memory stays bounded
+    total = 0
+    try:
+        while True:
+            chunk = source_cursor.fetchmany(INSERT_BATCH_SIZE)
+            if not chunk:
+                break
+            for start in range(0, len(chunk), rows_per_stmt):
+                batch = chunk[start:start + rows_per_stmt]
+                values = ', '.join([row_values] * len(batch))
+                params = [value for row in batch for value in row]
+                target_cursor.execute(f"INSERT INTO {table_name} VALUES {values}", params)
+            total += len(chunk)
+    except Exception as e:
+        logger.error(f"  Failed to insert into {table_name}: {e}")
+        # Don't leave the table cleared when the copy failed
+        target_conn.rollback()
+        return None
+
+    return total
+
+
+def load_sync_state(direction):
+    """Load the last synced table fingerprints for 'backup' or 'restore'."""
+    try:
+        with open(SYNC_STATE_PATH) as f:
+            return json.load(f).get(direction, {})
+    except (OSError, ValueError):
+        return {}
 
+
+def save_sync_state(direction, state):
+    """Atomically store table fingerprints for one sync direction."""
+    try:
+        with open(SYNC_STATE_PATH) as f:
+            all_state = json.load(f)
+    except (OSError, ValueError):
+        all_state = {}
+    all_state[direction] = state
+
+    tmp_path = f"{SYNC_STATE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(all_state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, SYNC_STATE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not save sync state: {e}")
+
+
+def table_fingerprint(conn, table_name):
+    """
+    Change detector for a table: [row count, max rowid, content digest].
+
+    The digest is a BLAKE2b hash over every row in rowid order, so in-place
+    UPDATEs (orchestrator_runs, portfolio_snapshot, market_data, ...) are
+    seen as well as inserts and deletes. This still reads the whole table,
+    but skips the delete and re-insert on the target when nothing changed.
+    WITHOUT ROWID tables report 0 as max rowid and hash in key order.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT rowid, * FROM {table_name} ORDER BY rowid")
+        has_rowid = True
+    except Exception:
+        cursor.execute(f"SELECT * FROM {table_name}")
+        has_rowid = False
+
+    digest = hashlib.blake2b(digest_size=16)
+    count = max_rowid = 0
+    while True:
+        chunk = cursor.fetchmany(INSERT_BATCH_SIZE)
+        if not chunk:
+            break
+        for row in chunk:
+            digest.update(repr(tuple(row)).encode())
+        count += len(chunk)
+        if has_rowid:
+            max_rowid = chunk[-1][0]
+    return [count, max_rowid, digest.hexdigest()]
+
+
+def _sync_one(get_source, get_target, table_name, col_count, last_state=None):
+    """
+    Sync one table on its own pair of connections and commit it.
+
+    Each worker thread opens its own connections because sqlite3/libsql
+    connections must not be shared across threads. If both sides still
+    match last_state ({'source': fp, 'target': fp}) the copy is skipped.
+    Returns (table_name, rows, new_state, status), where status is
+    'synced', 'skipped' or 'failed'; a failed copy has no new_state, so
+    its stale fingerprints are never recorded.
+    """
+    source_conn = get_source()
+    target_conn = get_target()
+    try:
+        source_fp = table_fingerprint(source_conn, table_name)
+        if last_state and last_state.get('source') == source_fp:
+            target_fp = table_fingerprint(target_conn, table_name)
+            if last_state.get('target') == target_fp:
+                return table_name, target_fp[0], last_state, 'skipped'
+
+        rows = sync_table(source_conn, target_conn, table_name, col_count)
+        if rows is None:
+            return table_name, 0, None, 'failed'
+        target_conn.commit()
+
+        new_state = {
+            'source': source_fp,
+            'target': table_fingerprint(target_conn, table_name),
+        }
+        return table_name, rows, new_state, 'synced'
+    except Exception as e:
+        # e.g. "database is locked" after the busy timeout, or a dropped
+        # Turso connection: fail this table, keep syncing the others
+        logger.error(f"  {table_name}: {e}")
+        return table_name, 0, None, 'failed'
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+
+def copy_sqlite_database(source_conn, target_conn, tables):
+    """
+    Copy a whole local SQLite database with the page-level backup API.
+
+    Much faster than row replay and uses constant memory, but only
+    available when both ends are sqlite3 connections. Returns total rows.
+    """
+    source_conn.backup(target_conn, pages=1024)
+    total_rows = 0
+    for table in tables:
+        count = target_conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        logger.info(f"  {table}: {count} rows")
+        total_rows += count
+    return total_rows
+
+
+def sync_tables(get_source, get_target, tables, state=None):
+    """
+    Sync tables concurrently; the work is dominated by Turso round-trips.
+
+    tables maps table name to column count (see get_tables).
+    Returns (total rows synced, names of tables that failed to copy).
+    Each table is committed independently.
+
+    state maps table name to the fingerprints recorded by the previous
+    sync; unchanged tables are skipped and state is updated in place.
+    Tables that fail to copy are dropped from state, so the next run
+    copies them again.
+    """
+    if state is None:
+        state = {}
+
+    total_rows = 0
+    failed = []
+    workers = max(1, min(SYNC_WORKERS, len(tables)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_sync_one, get_source, get_target, table, col_count,
+                            state.get(table))
+            for table, col_count in tables.items()
+        ]
+        for future in as_completed(futures):
+            table, rows, table_state, status = future.result()
+            if status == 'failed':
+                logger.error(f"  {table}: FAILED (will be copied again next sync)")
+                state.pop(table, None)
+                failed.append(table)
+                continue
+            if status == 'skipped':
+                logger.info(f"  {table}: {rows} rows (unchanged, skipped)")
+            else:
+                logger.info(f"  {table}: {rows} rows")
+            state[table] = table_state
+            total_rows += rows
+
+    # Forget tables that no longer exist
+    for table in set(state) - set(tables):
+        del state[table]
+    return total_rows, failed
+
+
+def pull_turso_snapshot(snapshot_path):
+    """
+    Write a standalone copy of the Turso database to snapshot_path.
+
+    Syncs the embedded replica (file-level frames, no row parsing), then
+    VACUUM INTOs it so the snapshot is a clean single-file database.
+    Raises if the libsql client lacks embedded replica support.
+    """
+    import libsql_experimental as libsql
+
+    replica = libsql.connect(REPLICA_DB_PATH, sync_url=TURSO_URL, auth_token=TURSO_TOKEN)
+    try:
+        replica.sync()
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        replica.execute("VACUUM INTO ?", (snapshot_path,))
+    finally:
+        replica.close()
+
+
+def backup_from_snapshot():
+    """
+    Backup via a file snapshot instead of replaying rows.
+
+    The snapshot is copied into the local database with the page-level
+    backup API rather than os.replace'd over it, so open readers and the
+    WAL stay consistent. Returns (tables, total_rows), or None if the
+    snapshot path is unavailable and the row copy should be used.
+    """
+    snapshot_path = LOCAL_DB_PATH + '.new'
+    try:
+        pull_turso_snapshot(snapshot_path)
+    except Exception as e:
+        logger.warning(f"Snapshot backup unavailable ({e}); falling back to row copy")
+        return None
+
+    try:
+        snapshot_conn = sqlite3.connect(snapshot_path)
+        local_conn = get_local_connection()
         try:
-            target_cursor.executemany(insert_sql, rows)
-        except Exception as e:
-            logger.error(f"  Failed to insert into {table_name}: {e}")
-            return 0
+            tables = get_tables(snapshot_conn)
+            total_rows = copy_sqlite_database(snapshot_conn, local_conn, tables)
+        finally:
+            snapshot_conn.close()
+            local_conn.close()
+    finally:
+        os.remove(snapshot_path)
 
-    return len(rows)
+    # Row-copy fingerprints no longer describe the local tables
+    save_sync_state('backup', {})
+    return tables, total_rows
 
 
-def backup():
+def backup(force=False):
     """Sync from Turso cloud to local SQLite (backup)."""
     if not TURSO_URL or not TURSO_TOKEN:
         logger.error("Turso credentials not set. Check TURSO_DATABASE_URL and TURSO_AUTH_TOKEN in .env")
@@ -104,32 +458,37 @@ def backup():
     logger.info(f"Target: {LOCAL_DB_PATH}")
     logger.info("")
 
-    turso_conn = get_turso_connection()
-    local_conn = get_local_connection()
-
     try:
-        tables = get_tables(turso_conn)
-        total_rows = 0
+        snapshot = backup_from_snapshot()
+        if snapshot:
+            tables, total_rows = snapshot
+            logger.info("")
+            logger.info(f"Backup complete (snapshot): {len(tables)} tables, {total_rows} total rows")
+            return True
+
+        turso_conn = get_turso_connection()
+        try:
+            tables = get_tables(turso_conn)
+        finally:
+            turso_conn.close()
 
-        for table in tables:
-            rows = sync_table(turso_conn, local_conn, table)
-            logger.info(f"  {table}: {rows} rows")
-            total_rows += rows
+        state = {} if force else load_sync_state('backup')
+        total_rows, failed = sync_tables(get_turso_connection, get_local_connection, tables, state)
+        save_sync_state('backup', state)
 
-        local_conn.commit()
         logger.info("")
+        if failed:
+            logger.error(f"Backup incomplete: {len(failed)} tables failed ({', '.join(sorted(failed))})")
+            return False
         logger.info(f"Backup complete: {len(tables)} tables, {total_rows} total rows")
         return True
 
     except Exception as e:
         logger.error(f"Backup failed: {e}")
         return False
-    finally:
-        turso_conn.close()
-        local_conn.close()
 
 
-def restore():
+def restore(force=False):
     """Sync from local SQLite to Turso cloud (restore)."""
     if not os.path.exists(LOCAL_DB_PATH):
         logger.error(f"Local database not found: {LOCAL_DB_PATH}")
@@ -146,29 +505,27 @@ def restore():
     logger.info(f"Target: {TURSO_URL[:40]}...")
     logger.info("")
 
-    local_conn = get_local_connection()
-    turso_conn = get_turso_connection()
-
     try:
-        tables = get_tables(local_conn)
-        total_rows = 0
+        local_conn = get_local_connection()
+        try:
+            tables = get_tables(local_conn)
+        finally:
+            local_conn.close()
 
-        for table in tables:
-            rows = sync_table(local_conn, turso_conn, table)
-            logger.info(f"  {table}: {rows} rows")
-            total_rows += rows
+        state = {} if force else load_sync_state('restore')
+        total_rows, failed = sync_tables(get_local_connection, get_turso_connection, tables, state)
+        save_sync_state('restore', state)
 
-        turso_conn.commit()
         logger.info("")
+        if failed:
+            logger.error(f"Restore incomplete: {len(failed)} tables failed ({', '.join(sorted(failed))})")
+            return False
         logger.info(f"Restore complete: {len(tables)} tables, {total_rows} total rows")
         return True
 
     except Exception as e:
         logger.error(f"Restore failed: {e}")
         return False
-    finally:
-        local_conn.close()
-        turso_conn.close()
 
 
 def main():
@@ -180,13 +537,15 @@ def main():
                        help='Backup: Cloud → Local')
     group.add_argument('--restore', action='store_true',
                        help='Restore: Local → Cloud')
+    parser.add_argument('--force', action='store_true',
+                        help='Copy every table, even ones that look unchanged')
 
     args = parser.parse_args()
 
     if args.backup:
-        success = backup()
+        success = backup(force=args.force)
     else:
-        success = restore()
+        success = restore(force=args.force)
 
     sys.exit(0 if success else 1)
 
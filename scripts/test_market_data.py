@@ -8,19 +8,21 @@ Usage: python scripts/test_market_data.py [SYMBOL1 SYMBOL2 ...]
 Default symbols: AAPL, MSFT, GOOGL
 """
 
+import asyncio
 import sys
 import os
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+from _bootstrap import PROJECT_ROOT, load_env
+load_env()
 
-from agents.market_analyst import MarketAnalyst
+project_root = Path(PROJECT_ROOT)
 
 
 def main():
     db_path = project_root / "data" / "agent.db"
+    alpaca_key = os.getenv("ALPACA_API_KEY")
+    alpaca_secret = os.getenv("ALPACA_SECRET_KEY")
 
     # Check database exists
     if not db_path.exists():
@@ -39,7 +41,6 @@ def main():
     print("=" * 60)
 
     # Show data source info
-    alpaca_key = os.getenv("ALPACA_API_KEY")
     if alpaca_key:
         print(f"📡 Data source: Alpaca API (with Yahoo Finance fallback)")
     else:
@@ -48,16 +49,19 @@ def main():
     print(f"🔍 Testing symbols: {', '.join(symbols)}")
     print("-" * 60)
 
+    # Deferred until the DB check passes; pulls in pandas/yfinance/alpaca
+    from agents.market_analyst import MarketAnalyst
+
     # Initialize market analyst
     ma = MarketAnalyst(
         str(db_path),
-        api_key=os.getenv("ALPACA_API_KEY"),
-        api_secret=os.getenv("ALPACA_SECRET_KEY")
+        api_key=alpaca_key,
+        api_secret=alpaca_secret
     )
 
     # Fetch data
     print("\nFetching market data...\n")
-    data = ma.scan_symbols(symbols)
+    data = asyncio.run(ma.ascan_symbols(symbols))
 
     if not data:
         print("❌ No data returned. Check your API keys and network connection.")
@@ -11,12 +11,8 @@ Usage:
 import sys
 import os
 
-# Add project paths
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
-
-from dotenv import load_dotenv
-load_dotenv()
+from _bootstrap import load_env
+load_env()
 
 from src.data.db_connection import get_connection, get_db_mode
 
@@ -50,11 +46,18 @@ def main():
 
             # Count rows in key tables
             print("\n3. Table Row Counts:")
-            for table in ['portfolio_snapshot', 'holdings', 'market_data', 'strategy_recommendations']:
-                if table in tables:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    count = cursor.fetchone()[0]
-                    print(f"   {table}: {count} rows")
+            key_tables = ['portfolio_snapshot', 'holdings', 'market_data', 'strategy_recommendations']
+            present = [table for table in key_tables if table in tables]
+            counts = {}
+            if present:
+                # One round-trip for all counts (matters in Turso mode)
+                cursor.execute(" UNION ALL ".join(
+                    f"SELECT '{table}', COUNT(*) FROM {table}" for table in present
+                ))
+                counts = dict(cursor.fetchall())
+            for table in key_tables:
+                if table in counts:
+                    print(f"   {table}: {counts[table]} rows")
                 else:
                     print(f"   {table}: TABLE NOT FOUND")
 
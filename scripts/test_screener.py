@@ -14,12 +14,10 @@ import os
 import argparse
 from pathlib import Path
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+from _bootstrap import PROJECT_ROOT, load_env
+load_env()
 
-from agents.stock_screener import StockScreener
-from utils.config import load_config
+project_root = Path(PROJECT_ROOT)
 
 
 def main():
@@ -28,6 +26,9 @@ def main():
     args = parser.parse_args()
 
     db_path = project_root / "data" / "agent.db"
+    alpaca_key = os.getenv("ALPACA_API_KEY")
+    alpaca_secret = os.getenv("ALPACA_SECRET_KEY")
+    alpha_key = os.getenv("ALPHA_VANTAGE_API_KEY")
 
     # Check database exists
     if not db_path.exists():
@@ -40,9 +41,6 @@ def main():
     print("=" * 60)
 
     # Show data source info
-    alpaca_key = os.getenv("ALPACA_API_KEY")
-    alpha_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-
     print("\n📡 Data Sources:")
     if alpaca_key:
         print("  ✅ Alpaca API (primary)")
@@ -59,6 +57,10 @@ def main():
         print("   Set ALPACA_API_KEY or ALPHA_VANTAGE_API_KEY in .env")
         return 1
 
+    # Deferred until arguments, DB and API keys check out
+    from agents.stock_screener import StockScreener
+    from utils.config import load_config
+
     # Load config
     try:
         config = load_config()
@@ -72,7 +74,7 @@ def main():
     screener = StockScreener(
         db_path=str(db_path),
         alpaca_key=alpaca_key,
-        alpaca_secret=os.getenv("ALPACA_SECRET_KEY"),
+        alpaca_secret=alpaca_secret,
         alpha_vantage_key=alpha_key,
         config=config
     )
@@ -9,10 +9,17 @@ Handles:
 - Market regime assessment
 """
 
+import asyncio
+import sqlite3
+import threading
+import time
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import pytz
 
 import logging
@@ -20,6 +27,30 @@ from src.data.db_connection import get_connection
 
 logger = logging.getLogger(__name__)
 
+# Symbols fetched concurrently (limits.market_data_fetch_workers);
+# set to 1 to fetch serially, e.g. to stay under API rate limits
+DEFAULT_FETCH_WORKERS = 8
+
+# Symbols bound per IN (...) query; SQLite builds before 3.32 allow 999
+SQL_IN_CHUNK_SIZE = 500
+
+# Bar frames kept in the in-process cache; the least recently used
+# frame is evicted beyond this
+BAR_CACHE_MAX_ENTRIES = 256
+
+# Write statements as module constants: every call passes the identical
+# string, so sqlite3's per-connection statement cache skips re-parsing
+_SQL_INSERT_MARKET = """
+    INSERT INTO market_data
+    (symbol, price, atr, sma_50, volume, is_volatile, timestamp, ts_epoch, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_UPSERT_META = """
+    INSERT OR REPLACE INTO stock_metadata
+    (symbol, name, sector, industry, avg_volume_20d, last_updated)
+    VALUES (?, ?, ?, ?, ?, datetime('now'))
+"""
+
 # Try to import Alpaca - will fail gracefully if not installed
 try:
     from alpaca.data import StockHistoricalDataClient
@@ -27,11 +58,25 @@ try:
     from alpaca.data.timeframe import TimeFrame
     from alpaca.trading.client import TradingClient
     from alpaca.trading.requests import GetCalendarRequest
+    from alpaca.common.exceptions import APIError
     ALPACA_AVAILABLE = True
 except ImportError:
     ALPACA_AVAILABLE = False
     logger.warning("alpaca-py not installed. Market data features will be limited.")
 
+# Alpaca bar columns -> the yfinance-style names the analysis reads
+_ALPACA_COLUMNS = {
+    'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+    'volume': 'Volume', 'trade_count': 'Trade_count', 'vwap': 'Vwap'
+}
+
+# Failures an Alpaca data call can raise outside _call_with_timeout:
+# API rejections, request validation and unexpected response shapes.
+# Anything else is a bug and propagates.
+ALPACA_DATA_ERRORS = (ValueError, KeyError, AttributeError)
+if ALPACA_AVAILABLE:
+    ALPACA_DATA_ERRORS += (APIError,)
+
 # Try yfinance as fallback
 try:
     import yfinance as yf
@@ -39,6 +84,223 @@ try:
 except ImportError:
     YFINANCE_AVAILABLE = False
 
+# yfinance-cache keeps Ticker history and info on disk between runs
+try:
+    import yfinance_cache as yfc
+    YFINANCE_CACHE_AVAILABLE = True
+except ImportError:
+    YFINANCE_CACHE_AVAILABLE = False
+
+# TA-Lib (C implementations of the indicator primitives) is optional
+try:
+    import talib
+    TALIB_AVAILABLE = True
+except ImportError:
+    TALIB_AVAILABLE = False
+
+
+# Price arrays fed to the indicators: float32 halves memory traffic and is
+# ample for daily prices, but TA-Lib only accepts float64
+INDICATOR_DTYPE = np.float64 if TALIB_AVAILABLE else np.float32
+
+
+def _sma_last(values: np.ndarray, period: int) -> Optional[float]:
+    """Simple moving average over the last `period` values, or None."""
+    if len(values) < period:
+        return None
+    # Only the last window is needed: a tail mean, not talib.SMA over the
+    # whole series. Accumulate in float64 even for float32 inputs
+    sma = values[-period:].mean(dtype=np.float64)
+    return float(sma) if np.isfinite(sma) else None
+
+
+def _wilder_weights(period: int, n: int) -> tuple:
+    """
+    Unrolled Wilder smoothing: avg_t = (avg_{t-1} * (period - 1) + x_t) / period
+    applied to n values after the seed equals
+    seed * decay + dot(weights, values), with decay = a**n and
+    weights[j] = a**(n-1-j) / period for a = (period - 1) / period.
+    """
+    a = (period - 1) / period
+    return a ** n, a ** np.arange(n - 1, -1, -1, dtype=np.float64) / period
+
+
+def _wilder_last(values: np.ndarray, period: int) -> float:
+    """
+    Last value of Wilder's smoothing over `values`, seeded with the mean of
+    the first `period` values; one dot product instead of a Python loop.
+    """
+    seed = values[:period].mean(dtype=np.float64)
+    decay, weights = _wilder_weights(period, len(values) - period)
+    return seed * decay + np.dot(weights, values[period:])
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    TR_t = max(High-Low, |High-PrevClose|, |Low-PrevClose|) from the second
+    bar on; works row-wise on (n_symbols, n_days) arrays too.
+    """
+    prev_close = close[..., :-1]
+    return np.maximum.reduce([
+        high[..., 1:] - low[..., 1:],
+        np.abs(high[..., 1:] - prev_close),
+        np.abs(low[..., 1:] - prev_close)
+    ])
+
+
+def _wilder_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> float:
+    """
+    Wilder's ATR: true ranges smoothed with _wilder_last.
+    
+    Same convention as TA-Lib's ATR; needs len(close) > period.
+    """
+    return _wilder_last(_true_range(high, low, close), period)
+
+
+def _wilder_atr_fused(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> float:
+    """
+    _wilder_atr as one loop with no temporary arrays; only used when Numba
+    compiles it (interpreted, the vectorized version is faster).
+    """
+    atr = 0.0
+    for i in range(1, len(close)):
+        prev_close = close[i - 1]
+        true_range = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+        if i <= period:
+            atr += true_range / period
+        else:
+            atr = (atr * (period - 1) + true_range) / period
+    return atr
+
+
+# Numba is optional; no fastmath, it would let NaN inputs slip through the
+# isfinite checks
+try:
+    from numba import njit
+    _wilder_atr_fused = njit(cache=True)(_wilder_atr_fused)
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _wilder_rsi(close: np.ndarray, period: int) -> float:
+    """
+    Wilder's RSI: average gain/loss seeded with the mean of the first
+    `period` changes, then smoothed with _wilder_last.
+    
+    Same convention as TA-Lib's RSI; needs len(close) > period. Returns NaN
+    for a flat window (no gains or losses).
+    """
+    change = np.diff(close)
+    avg_gain = _wilder_last(np.maximum(change, 0), period)
+    avg_loss = _wilder_last(np.maximum(-change, 0), period)
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Optional[float]:
+    """Wilder Average True Range at the last bar, or None if too short."""
+    if len(close) < period + 1:
+        return None
+    if TALIB_AVAILABLE:
+        atr = talib.ATR(high, low, close, timeperiod=period)[-1]
+    elif NUMBA_AVAILABLE:
+        atr = _wilder_atr_fused(high, low, close, period)
+    else:
+        atr = _wilder_atr(high, low, close, period)
+    return float(atr) if np.isfinite(atr) else None
+
+
+def _wilder_atr_step(atr: float, high: float, low: float, prev_close: float, period: int) -> float:
+    """One Wilder update: fold the next bar's true range into the ATR."""
+    true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    return (atr * (period - 1) + float(true_range)) / period
+
+
+def _atr_by_symbol(frames: Dict[str, pd.DataFrame], period: int = 14) -> Dict[str, Optional[float]]:
+    """
+    Wilder ATR at the last bar for many symbols at once.
+    
+    Frames with the same number of bars are stacked into (n_symbols, n_days)
+    arrays and smoothed together with one matrix-vector product instead of
+    a separate pass per symbol. Symbols with too few bars map to None.
+    """
+    by_length: Dict[int, List[str]] = {}
+    for symbol, df in frames.items():
+        by_length.setdefault(len(df), []).append(symbol)
+    
+    atrs = {}
+    for length, symbols in by_length.items():
+        if length < period + 1:
+            atrs.update(dict.fromkeys(symbols, None))
+            continue
+        
+        high, low, close = (
+            np.vstack([frames[s][column].to_numpy(dtype=INDICATOR_DTYPE) for s in symbols])
+            for column in ('High', 'Low', 'Close')
+        )
+        true_range = _true_range(high, low, close)
+        
+        # Wilder smoothing for every row at once (see _wilder_weights)
+        seed = true_range[:, :period].mean(axis=1, dtype=np.float64)
+        decay, weights = _wilder_weights(period, true_range.shape[1] - period)
+        atr = seed * decay + true_range[:, period:] @ weights
+        
+        for symbol, value in zip(symbols, atr):
+            atrs[symbol] = float(value) if np.isfinite(value) else None
+    return atrs
+
+
+def _yf_ticker(symbol: str):
+    """yfinance Ticker, served from the yfinance-cache disk cache if installed."""
+    if YFINANCE_CACHE_AVAILABLE:
+        return yfc.Ticker(symbol)
+    return yf.Ticker(symbol)
+
+
+def _classify_regime(price: float, sma_20: Optional[float], sma_50: Optional[float],
+                     atr: Optional[float]) -> str:
+    """
+    Market regime from the trailing indicator values.
+    
+    Returns: 'Trending Up', 'Trending Down', 'Ranging', 'High Volatility',
+    or 'Unknown' when the moving averages are unavailable
+    """
+    if sma_50 is None or sma_20 is None:
+        return "Unknown"
+    
+    volatility_pct = (atr or 0) / price if price > 0 else 0
+    
+    # High volatility override
+    if volatility_pct > 0.05:
+        return "High Volatility"
+    
+    # Trend detection
+    if price > sma_50 and sma_20 > sma_50:
+        return "Trending Up"
+    elif price < sma_50 and sma_20 < sma_50:
+        return "Trending Down"
+    else:
+        return "Ranging"
+
+
+@dataclass
+class OHLCV:
+    """
+    Daily bars as contiguous arrays, extracted once from a bars DataFrame.
+    
+    Prices use INDICATOR_DTYPE; volume stays float64 since share counts
+    above 2**24 are not exact in float32.
+    """
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.close)
+
 
 class MarketAnalyst:
     """Agent responsible for market data analysis and technical indicators."""
@@ -58,6 +320,29 @@ class MarketAnalyst:
         self.api_key = api_key
         self.api_secret = api_secret
         self.config = config or {}
+        self.fetch_workers = max(1, int(
+            self.config.get('limits', {}).get('market_data_fetch_workers', DEFAULT_FETCH_WORKERS)
+        ))
+        
+        # (source, symbol, lookback) -> (fetched_at, DataFrame); repeat calls
+        # within the market data TTL reuse the frame instead of re-downloading
+        self.bar_cache_ttl = self.config.get('limits', {}).get('market_data_ttl_seconds', 300)
+        self._bar_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._bar_cache_lock = threading.Lock()
+        
+        # market_data migrations run once, on first database access
+        self._schema_checked = False
+        
+        # symbol -> (timestamp of the first bar, timestamp of the last
+        # completed bar, ATR through it), advanced by _streaming_atr
+        self._atr_state: Dict[str, tuple] = {}
+        
+        # Alpaca calendar answers by US/Eastern date (stable for the day)
+        self._trading_day_cache: Dict[date, bool] = {}
+        
+        # Long-lived pool that runs API calls under _call_with_timeout
+        self._api_executor: Optional[ThreadPoolExecutor] = None
+        self._api_executor_lock = threading.Lock()
         
         self.alpaca_client = None
         self.trading_client = None
@@ -79,53 +364,188 @@ class MarketAnalyst:
         Returns:
             Dict mapping symbol -> metrics dict
         """
+        analyze = self._start_scan(symbols)
+        outcomes = {}
+        
+        # Per-symbol fetches are network-bound: overlap them on a thread pool
+        # (safe to call from inside an event loop, unlike asyncio.run)
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            futures = {executor.submit(analyze, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                try:
+                    outcomes[futures[future]] = future.result()
+                except Exception as e:
+                    outcomes[futures[future]] = e
+        
+        return self._finish_scan(symbols, outcomes)
+    
+    async def ascan_symbols(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Async variant of scan_symbols: fetches all symbols concurrently.
+        
+        Each symbol is analyzed in a worker thread (the Alpaca and yfinance
+        clients are blocking), at most fetch_workers at a time. The quote
+        fallback and the single-transaction write also run off the event loop.
+        """
+        analyze = await asyncio.to_thread(self._start_scan, symbols)
+        semaphore = asyncio.Semaphore(self.fetch_workers)
+        
+        async def run(symbol: str) -> Optional[Dict]:
+            async with semaphore:
+                return await asyncio.to_thread(analyze, symbol)
+        
+        outcomes = await asyncio.gather(
+            *(run(symbol) for symbol in symbols), return_exceptions=True
+        )
+        return await asyncio.to_thread(
+            self._finish_scan, symbols, dict(zip(symbols, outcomes))
+        )
+    
+    def _start_scan(self, symbols: List[str]) -> Callable[[str], Optional[Dict]]:
+        """
+        Bulk-fetch bars and ATRs for a scan and return the per-symbol analyzer.
+        
+        Quotes are left to _finish_scan, which fetches them for all misses
+        in one request.
+        """
+        prefetched = self._prefetch_bars(symbols)
+        prefetched_atr = _atr_by_symbol(prefetched) if prefetched else None
+        
+        def analyze(symbol: str) -> Optional[Dict]:
+            return self._analyze_symbol(symbol, prefetched=prefetched,
+                                        prefetched_atr=prefetched_atr, quote_fallback=False)
+        return analyze
+    
+    def _finish_scan(self, symbols: List[str], outcomes: Dict[str, Any]) -> Dict[str, Dict]:
+        """
+        Turn per-symbol outcomes into scan results and store them.
+        
+        outcomes maps symbol -> metrics, None (no data) or the exception
+        raised. Symbols without metrics fall back to one bulk quote request;
+        results keep the caller's symbol order and are written in one
+        transaction.
+        """
         results = {}
+        for symbol, metrics in outcomes.items():
+            if isinstance(metrics, BaseException):
+                logger.error(f"Error analyzing {symbol}: {metrics}")
+                continue
+            # Expected misses (no data for the symbol) come back as None
+            if metrics is not None:
+                results[symbol] = metrics
         
-        for symbol in symbols:
-            try:
-                metrics = self._analyze_symbol(symbol)
-                if metrics:
-                    results[symbol] = metrics
-                    self._write_to_db(symbol, metrics)
-            except Exception as e:
-                logger.error(f"Error analyzing {symbol}: {e}")
+        missing = [symbol for symbol in symbols if symbol not in results]
+        if missing:
+            results.update(self._fetch_alpaca_quotes_bulk(missing))
+        
+        results = {symbol: results[symbol] for symbol in symbols if symbol in results}
         
+        self._write_many_to_db(results)
         return results
     
-    def _analyze_symbol(self, symbol: str) -> Optional[Dict]:
+    def _prefetch_bars(self, symbols: List[str]) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Fetch Alpaca bars for all symbols in one request.
+        
+        Returns None (callers fetch per symbol) when Alpaca is not
+        configured, there is only one symbol, or the bulk request fails.
+        yfinance history is downloaded in one batch instead for the
+        symbols Alpaca cannot serve (all of them without Alpaca, else those
+        missing from the bulk response) and lands in the bar cache that
+        _fetch_yfinance_data reads.
+        """
+        if len(symbols) < 2:
+            return None
+        
+        if not self.alpaca_client:
+            self._prefetch_yfinance_bars(symbols)
+            return None
+        
+        # Only request symbols without a fresh cached frame
+        prefetched = {}
+        missing = []
+        for symbol in symbols:
+            df = self._get_cached_bars(('alpaca', symbol, 90))
+            if df is not None:
+                prefetched[symbol] = df
+            else:
+                missing.append(symbol)
+        if not missing:
+            return prefetched
+        
+        fetched = self._fetch_alpaca_data_bulk(missing)
+        if fetched is None:
+            return None
+        prefetched.update(fetched)
+        self._prefetch_yfinance_bars([s for s in missing if s not in fetched])
+        return prefetched
+    
+    def _prefetch_yfinance_bars(self, symbols: List[str]):
+        """Batch-download yfinance history for uncached symbols (two or more)."""
+        if not YFINANCE_AVAILABLE:
+            return
+        missing = [s for s in symbols if self._get_cached_bars(('yfinance', s, '90d')) is None]
+        if len(missing) > 1:
+            self._fetch_yfinance_data_bulk(missing)
+    
+    def _analyze_symbol(self, symbol: str,
+                        prefetched: Optional[Dict[str, pd.DataFrame]] = None,
+                        prefetched_atr: Optional[Dict[str, Optional[float]]] = None,
+                        quote_fallback: bool = True) -> Optional[Dict]:
         """
         Analyze a single symbol.
 
-        Returns dict with price, atr, sma_50, is_volatile, timestamp
+        Args:
+            symbol: Stock ticker symbol
+            prefetched: Alpaca bars from _fetch_alpaca_data_bulk; when given,
+                symbols missing from it are not re-requested from Alpaca
+            prefetched_atr: ATRs of the prefetched frames, computed for the
+                whole watchlist by _atr_by_symbol
+            quote_fallback: Fetch an Alpaca quote when no bars are available;
+                scans disable it and batch the quotes for all misses instead
+
+        Returns dict with price, atr, sma_20, sma_50, is_volatile, regime,
+        timestamp
         """
         df = None
 
         # Try Alpaca historical data first
         if self.alpaca_client:
-            df = self._fetch_alpaca_data(symbol)
+            if prefetched is not None:
+                df = prefetched.get(symbol)
+            else:
+                df = self._fetch_alpaca_data(symbol)
 
         # Fallback to yfinance if Alpaca bars unavailable
         if (df is None or df.empty) and YFINANCE_AVAILABLE:
             df = self._fetch_yfinance_data(symbol)
 
         # Final fallback: use Alpaca quote for price only (no indicators)
-        if (df is None or df.empty) and self.alpaca_client:
+        if (df is None or df.empty) and self.alpaca_client and quote_fallback:
             return self._fetch_alpaca_quote_only(symbol)
 
         if df is None or df.empty:
             logger.warning(f"No data available for {symbol}")
             return None
         
-        # Extract current price
-        current_price = float(df['Close'].iloc[-1])
+        # Pull the columns out of the frame once; everything below only
+        # needs the trailing values
+        bars = self._to_ohlcv(df)
+        
+        # Extract current price (from the source frame: it is stored, so
+        # keep it exact rather than float32-rounded)
+        current_price = float(df['Close'].iat[-1])
         
-        # Calculate ATR for volatility
-        atr = self._calculate_atr(df, period=14)
+        # Calculate ATR for volatility (already done in the batch if the
+        # bars are the prefetched frame)
+        if prefetched_atr is not None and symbol in prefetched_atr and df is prefetched.get(symbol):
+            atr = prefetched_atr[symbol]
+        else:
+            atr = self._streaming_atr(symbol, df, bars, period=14)
         
-        # Calculate 50-day SMA
-        sma_50 = None
-        if len(df) >= 50:
-            sma_50 = float(df['Close'].rolling(50).mean().iloc[-1])
+        # Calculate 20- and 50-day SMAs
+        sma_20 = _sma_last(bars.close, 20)
+        sma_50 = _sma_last(bars.close, 50)
         
         # Detect high volatility (ATR > 8% of price - relaxed from 5% to reduce false positives)
         is_volatile = False
@@ -133,42 +553,101 @@ class MarketAnalyst:
             is_volatile = (atr / current_price) > 0.08
         
         # Detect price spike (>2x ATR move in recent period)
-        if atr and len(df) >= 15:
-            recent_range = df['High'].iloc[-15:].max() - df['Low'].iloc[-15:].min()
+        if atr and len(bars) >= 15:
+            recent_range = np.nanmax(bars.high[-15:]) - np.nanmin(bars.low[-15:])
             if recent_range > (2 * atr):
                 is_volatile = True
         
         # Calculate 20-day average volume for liquidity check
         avg_volume = None
-        if 'Volume' in df.columns and len(df) >= 20:
-            avg_volume = int(df['Volume'].tail(20).mean())
+        if bars.volume is not None and len(bars) >= 20:
+            volume_20 = np.nanmean(bars.volume[-20:])
+            if np.isfinite(volume_20):
+                avg_volume = int(volume_20)
         
         source = 'Alpaca' if self.alpaca_client else 'YFinance'
         
         return {
             'price': current_price,
             'atr': atr,
+            'sma_20': sma_20,
             'sma_50': sma_50,
             'avg_volume': avg_volume,
             'is_volatile': is_volatile,
+            'regime': _classify_regime(current_price, sma_20, sma_50, atr),
             'source': source,
             'timestamp': datetime.now().isoformat()
         }
     
+    def _get_api_executor(self) -> ThreadPoolExecutor:
+        """
+        Shared pool for _call_with_timeout, created on first use.
+        
+        Sized at twice fetch_workers: a call that times out keeps its
+        worker until it returns, so the scan threads still find free ones.
+        """
+        with self._api_executor_lock:
+            if self._api_executor is None:
+                self._api_executor = ThreadPoolExecutor(
+                    max_workers=2 * self.fetch_workers,
+                    thread_name_prefix='market-api'
+                )
+            return self._api_executor
+    
+    def close(self):
+        """
+        Release the API worker pool without waiting on calls still in
+        flight (a hung request would otherwise block the caller).
+        """
+        with self._api_executor_lock:
+            executor, self._api_executor = self._api_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def _call_with_timeout(self, func: Callable, timeout: int = 10, context: str = "API call"):
         """Execute a function with a timeout to prevent hangs."""
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(func)
-            try:
-                return future.result(timeout=timeout)
-            except FuturesTimeoutError:
-                logger.error(f"{context} timed out after {timeout}s")
+        future = self._get_api_executor().submit(func)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            logger.error(f"{context} timed out after {timeout}s")
+            return None
+        except Exception as e:
+            logger.error(f"{context} failed: {e}")
+            return None
+
+    def _get_cached_bars(self, key: tuple) -> Optional[pd.DataFrame]:
+        """Return a cached bar frame if it is younger than the TTL."""
+        with self._bar_cache_lock:
+            entry = self._bar_cache.get(key)
+            if entry is None:
                 return None
-            except Exception as e:
-                logger.error(f"{context} failed: {e}")
+            if time.monotonic() - entry[0] >= self.bar_cache_ttl:
+                del self._bar_cache[key]
                 return None
-
+            self._bar_cache.move_to_end(key)
+            return entry[1]
+    
+    def _cache_bars(self, key: tuple, df: Optional[pd.DataFrame]):
+        """Store a fetched bar frame; empty results are not cached."""
+        if df is None or df.empty:
+            return
+        with self._bar_cache_lock:
+            self._bar_cache[key] = (time.monotonic(), df)
+            self._bar_cache.move_to_end(key)
+            while len(self._bar_cache) > BAR_CACHE_MAX_ENTRIES:
+                self._bar_cache.popitem(last=False)
+    
     def _fetch_alpaca_data(self, symbol: str, days: int = 90) -> Optional[pd.DataFrame]:
+        """Fetch historical data from Alpaca, reusing frames fetched within the TTL."""
+        key = ('alpaca', symbol, days)
+        df = self._get_cached_bars(key)
+        if df is None:
+            df = self._download_alpaca_data(symbol, days)
+            self._cache_bars(key, df)
+        return df
+    
+    def _download_alpaca_data(self, symbol: str, days: int = 90) -> Optional[pd.DataFrame]:
         """Fetch historical data from Alpaca with timeout protection (90 days for reliable SMA50)."""
         if not self.alpaca_client:
             return None
@@ -191,36 +670,118 @@ class MarketAnalyst:
                 return None
             
             # Handle different alpaca-py SDK versions
-            try:
-                if hasattr(bars, 'df'):
-                    # Newer SDK: multi-index DataFrame
-                    df = bars.df
-                    if df.empty:
-                        return None
-                    # Check if symbol is in the index
-                    if isinstance(df.index, pd.MultiIndex):
-                        if symbol in df.index.get_level_values(0):
-                            df = df.loc[symbol]
-                        else:
-                            return None
-                elif symbol in bars:
-                    # Older SDK: dict-like access
-                    df = bars[symbol].df
-                else:
+            if hasattr(bars, 'df'):
+                # Newer SDK: multi-index DataFrame
+                df = bars.df
+                if df.empty:
                     return None
-            except Exception as e:
-                logger.warning(f"Unexpected bars structure for {symbol}: {e}")
+                # Check if symbol is in the index
+                if isinstance(df.index, pd.MultiIndex):
+                    if symbol not in df.index.get_level_values(0):
+                        return None
+                    df = df.loc[symbol]
+            elif symbol in bars:
+                # Older SDK: dict-like access
+                df = bars[symbol].df
+            else:
                 return None
             
             # Rename columns to match yfinance format
-            df.columns = [c.capitalize() for c in df.columns]
-            return df
+            return df.rename(columns=_ALPACA_COLUMNS)
             
-        except Exception as e:
+        except ALPACA_DATA_ERRORS as e:
             logger.error(f"Alpaca fetch error for {symbol}: {e}")
             return None
     
+    def _fetch_alpaca_data_bulk(self, symbols: List[str], days: int = 90) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Fetch historical bars for many symbols with a single Alpaca request.
+        
+        Returns a dict of symbol -> DataFrame (yfinance column names), or
+        None if the request failed. Symbols without bars are omitted.
+        """
+        if not self.alpaca_client:
+            return None
+        
+        try:
+            request = StockBarsRequest(
+                symbol_or_symbols=list(symbols),
+                timeframe=TimeFrame.Day,
+                start=datetime.now() - timedelta(days=days)
+            )
+            
+            bars = self._call_with_timeout(
+                lambda: self.alpaca_client.get_stock_bars(request),
+                timeout=30,
+                context=f"Alpaca bulk bars fetch for {len(symbols)} symbols"
+            )
+            
+            if bars is None:
+                return None
+            
+            df = bars.df
+            if df.empty or not isinstance(df.index, pd.MultiIndex):
+                return {}
+            
+            # MultiIndex (symbol, timestamp): one frame per symbol, also
+            # cached for later single-symbol lookups. Columns are renamed
+            # once for the whole response, not per symbol
+            df = df.rename(columns=_ALPACA_COLUMNS)
+            frames = {}
+            for symbol, frame in df.groupby(level=0, sort=False):
+                frame = frame.droplevel(0)
+                frames[symbol] = frame
+                self._cache_bars(('alpaca', symbol, days), frame)
+            return frames
+            
+        except ALPACA_DATA_ERRORS as e:
+            logger.error(f"Alpaca bulk fetch error: {e}")
+            return None
+    
     def _fetch_yfinance_data(self, symbol: str, period: str = "90d") -> Optional[pd.DataFrame]:
+        """Fetch historical data from Yahoo Finance, reusing frames fetched within the TTL."""
+        key = ('yfinance', symbol, period)
+        df = self._get_cached_bars(key)
+        if df is None:
+            df = self._download_yfinance_data(symbol, period)
+            self._cache_bars(key, df)
+        return df
+    
+    def _fetch_yfinance_data_bulk(self, symbols: List[str], period: str = "90d") -> Dict[str, pd.DataFrame]:
+        """
+        Download history for many symbols with one batched yf.download.
+        
+        Returns a dict of symbol -> DataFrame (symbols without data are
+        omitted) and caches each frame for _fetch_yfinance_data.
+        """
+        if not YFINANCE_AVAILABLE:
+            return {}
+        
+        data = self._call_with_timeout(
+            lambda: yf.download(
+                list(symbols), period=period, group_by='ticker',
+                threads=True, progress=False, auto_adjust=True
+            ),
+            timeout=30,
+            context=f"yfinance bulk download for {len(symbols)} symbols"
+        )
+        
+        if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return {}
+        
+        frames = {}
+        tickers = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in tickers:
+                continue
+            frame = data[symbol].dropna(how='all')
+            if frame.empty:
+                continue
+            frames[symbol] = frame
+            self._cache_bars(('yfinance', symbol, period), frame)
+        return frames
+    
+    def _download_yfinance_data(self, symbol: str, period: str = "90d") -> Optional[pd.DataFrame]:
         """Fetch historical data from Yahoo Finance with timeout protection."""
         if not YFINANCE_AVAILABLE:
             return None
@@ -228,7 +789,7 @@ class MarketAnalyst:
         try:
             # Wrap yfinance call with timeout
             def fetch():
-                ticker = yf.Ticker(symbol)
+                ticker = _yf_ticker(symbol)
                 return ticker.history(period=period)
             
             df = self._call_with_timeout(
@@ -251,101 +812,164 @@ class MarketAnalyst:
         Fallback: fetch just the latest quote from Alpaca when historical data unavailable.
         Returns basic metrics without ATR/SMA (requires paid subscription for bars).
         """
-        if not self.alpaca_client:
-            return None
+        return self._fetch_alpaca_quotes_bulk([symbol]).get(symbol)
+
+    def _fetch_alpaca_quotes_bulk(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Quote-only metrics for many symbols with a single latest-quote request.
+        
+        Returns a dict of symbol -> metrics; symbols without a usable quote
+        are omitted.
+        """
+        if not self.alpaca_client or not symbols:
+            return {}
 
         try:
-            request = StockLatestQuoteRequest(symbol_or_symbols=[symbol])
+            request = StockLatestQuoteRequest(symbol_or_symbols=list(symbols))
             
             # Wrap quote fetch with timeout
-            quote = self._call_with_timeout(
+            quotes = self._call_with_timeout(
                 lambda: self.alpaca_client.get_stock_latest_quote(request),
                 timeout=10,
-                context=f"Alpaca quote fetch for {symbol}"
+                context=f"Alpaca quote fetch for {', '.join(symbols)}"
             )
 
-            if not quote or symbol not in quote:
-                return None
+            if not quotes:
+                return {}
 
-            q = quote[symbol]
-            # Use midpoint of bid/ask as price
-            price = (q.bid_price + q.ask_price) / 2 if q.bid_price and q.ask_price else q.ask_price
+            results = {}
+            timestamp = datetime.now().isoformat()
+            for symbol in symbols:
+                q = quotes.get(symbol)
+                if q is None:
+                    continue
+                # Use midpoint of bid/ask as price
+                price = (q.bid_price + q.ask_price) / 2 if q.bid_price and q.ask_price else q.ask_price
+                if not price:
+                    continue
 
-            logger.info(f"Using Alpaca quote for {symbol}: ${price:.2f} (no historical data)")
+                logger.info(f"Using Alpaca quote for {symbol}: ${price:.2f} (no historical data)")
 
-            return {
-                'price': float(price),
-                'atr': None,  # Can't calculate without historical data
-                'sma_50': None,
-                'is_volatile': False,  # Unknown without historical data
-                'avg_volume': None,
-                'source': 'Alpaca-Quote',
-                'timestamp': datetime.now().isoformat()
-            }
+                results[symbol] = {
+                    'price': float(price),
+                    'atr': None,  # Can't calculate without historical data
+                    'sma_50': None,
+                    'is_volatile': False,  # Unknown without historical data
+                    'avg_volume': None,
+                    'source': 'Alpaca-Quote',
+                    'timestamp': timestamp
+                }
+            return results
 
-        except Exception as e:
-            logger.error(f"Alpaca quote error for {symbol}: {e}")
-            return None
+        except ALPACA_DATA_ERRORS as e:
+            logger.error(f"Alpaca quote error for {', '.join(symbols)}: {e}")
+            return {}
 
-    def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> Optional[float]:
+    @staticmethod
+    def _to_ohlcv(df: pd.DataFrame) -> OHLCV:
+        """
+        Extract High/Low/Close (and Volume, if present) arrays.
+        
+        The frame is copied out as one float64 matrix and the columns are
+        sliced from it, instead of a Series lookup and conversion per column.
+        """
+        columns = ['High', 'Low', 'Close']
+        if 'Volume' in df.columns:
+            columns.append('Volume')
+        try:
+            values = df.to_numpy(dtype=np.float64)
+            locs = [df.columns.get_loc(column) for column in columns]
+        except (TypeError, ValueError):
+            # Non-numeric extra columns: convert only the ones needed
+            values = df[columns].to_numpy(dtype=np.float64)
+            locs = list(range(len(columns)))
+        
+        rows = values[:, locs].T
+        prices = np.ascontiguousarray(rows[:3], dtype=INDICATOR_DTYPE)
+        return OHLCV(
+            high=prices[0],
+            low=prices[1],
+            close=prices[2],
+            volume=np.ascontiguousarray(rows[3]) if len(columns) == 4 else None
+        )
+    
+    def _calculate_atr(self, bars: OHLCV, period: int = 14) -> Optional[float]:
         """
         Calculate Average True Range.
         
-        ATR = Average of True Range over period
+        ATR = Wilder-smoothed average of True Range over period
         True Range = max(High-Low, |High-PrevClose|, |Low-PrevClose|)
         """
-        if len(df) < period + 1:
-            return None
-        
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
+        return _atr(bars.high, bars.low, bars.close, period)
+    
+    def _streaming_atr(self, symbol: str, df: pd.DataFrame, bars: OHLCV,
+                       period: int = 14) -> Optional[float]:
+        """
+        ATR carried across calls with Wilder's update instead of recomputed.
         
-        # Calculate True Range components
-        high_low = high - low
-        high_close = (high - close.shift()).abs()
-        low_close = (low - close.shift()).abs()
+        The state holds the ATR through the last completed bar (every bar
+        but the final one, which is still forming intraday). Seeing the same
+        completed bar again costs one update, one newer bar two; anything
+        else (first call, a gap) recomputes from the full history.
         
-        # True Range is max of the three
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+        Wilder's ATR depends on where its seed window starts, so the state
+        is only reused when the frame still begins at the same bar; a
+        window that slid forward is recomputed to match the batch ATR.
+        """
+        n = len(bars)
+        if n < period + 3:
+            return self._calculate_atr(bars, period)
         
-        # ATR is the rolling mean
-        atr = true_range.rolling(period).mean().iloc[-1]
+        high, low, close = bars.high, bars.low, bars.close
+        first = df.index[0]
+        state = self._atr_state.get(symbol)
+        if state is not None and state[0] != first:
+            state = None
+        if state is not None and state[1] == df.index[-2]:
+            completed = state[2]
+        elif state is not None and state[1] == df.index[-3]:
+            completed = _wilder_atr_step(state[2], high[-2], low[-2], close[-3], period)
+        else:
+            completed = _atr(high[:-1], low[:-1], close[:-1], period)
+            if completed is None:
+                return None
+        self._atr_state[symbol] = (first, df.index[-2], completed)
         
-        return float(atr) if pd.notna(atr) else None
+        atr = _wilder_atr_step(completed, high[-1], low[-1], close[-2], period)
+        return atr if np.isfinite(atr) else None
     
-    def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> Optional[float]:
+    def _calculate_rsi(self, bars: OHLCV, period: int = 14) -> Optional[float]:
         """
         Calculate Relative Strength Index.
         
         RSI = 100 - (100 / (1 + RS))
-        RS = Average Gain / Average Loss
+        RS = Average Gain / Average Loss (Wilder-smoothed)
         """
-        if len(df) < period + 1:
+        if len(bars) < period + 1:
             return None
         
-        delta = df['Close'].diff()
-        
-        gain = delta.where(delta > 0, 0)
-        loss = (-delta).where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(period).mean()
-        avg_loss = loss.rolling(period).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        close = bars.close
+        if TALIB_AVAILABLE:
+            rsi = talib.RSI(close, timeperiod=period)[-1]
+        else:
+            rsi = _wilder_rsi(close, period)
         
-        return float(rsi.iloc[-1]) if pd.notna(rsi.iloc[-1]) else None
+        return float(rsi) if np.isfinite(rsi) else None
     
     def _write_to_db(self, symbol: str, metrics: Dict):
         """Persist market data to shared database."""
-        with get_connection(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO market_data (symbol, price, atr, sma_50, volume, is_volatile, timestamp, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        self._write_many_to_db({symbol: metrics})
+    
+    def _write_many_to_db(self, results: Dict[str, Dict]):
+        """
+        Persist market data for many symbols with one executemany and a
+        single commit. Failures are logged, not raised.
+        """
+        if not results:
+            return
+        
+        rows = [
+            (
                 symbol.upper(),
                 metrics['price'],
                 metrics.get('atr'),
@@ -353,12 +977,57 @@ class MarketAnalyst:
                 metrics.get('avg_volume'),
                 1 if metrics.get('is_volatile') else 0,
                 metrics['timestamp'],
+                int(datetime.fromisoformat(metrics['timestamp']).timestamp()),
                 metrics.get('source', 'Unknown')
-            ))
-            
-            conn.commit()
+            )
+            for symbol, metrics in results.items()
+        ]
+        
+        try:
+            with get_connection(self.db_path) as conn:
+                if isinstance(conn, sqlite3.Connection):
+                    # Take the write lock up front: all rows land in one
+                    # transaction without a mid-batch lock upgrade
+                    conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                self._ensure_schema(cursor)
+                
+                cursor.executemany(_SQL_INSERT_MARKET, rows)
+                
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error writing market data for {', '.join(results)}: {e}")
+            return
+        
+        logger.debug(f"Wrote market data for {len(rows)} symbols to database")
+    
+    def _ensure_schema(self, cursor):
+        """
+        Add the ts_epoch column and the per-symbol lookup indexes to
+        market_data tables created without them (for incremental migrations).
         
-        logger.debug(f"Wrote market data for {symbol} to database")
+        (symbol, timestamp DESC) serves the other agents' latest-row
+        queries, (symbol, ts_epoch DESC) get_latest_price: either way the
+        newest row is an index seek instead of a scan of the symbol's rows.
+        """
+        if self._schema_checked:
+            return
+        
+        cursor.execute("SELECT name FROM pragma_table_info('market_data')")
+        columns = {row[0] for row in cursor.fetchall()}
+        if columns and 'ts_epoch' not in columns:
+            cursor.execute("ALTER TABLE market_data ADD COLUMN ts_epoch INTEGER")
+            logger.info("Added ts_epoch column to market_data")
+        if columns:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_market_data_symbol "
+                "ON market_data(symbol, timestamp DESC)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_market_data_symbol_epoch "
+                "ON market_data(symbol, ts_epoch DESC)"
+            )
+        self._schema_checked = True
     
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """
@@ -368,27 +1037,25 @@ class MarketAnalyst:
         """
         with get_connection(self.db_path) as conn:
             cursor = conn.cursor()
+            self._ensure_schema(cursor)
             
             cursor.execute("""
-                SELECT price, timestamp
+                SELECT price, ts_epoch
                 FROM market_data
                 WHERE symbol = ?
-                ORDER BY timestamp DESC
+                ORDER BY ts_epoch DESC
                 LIMIT 1
             """, (symbol.upper(),))
             
             row = cursor.fetchone()
         
-        if row:
-            price, timestamp = row
-            # Check if cache is recent (within 5 minutes)
-            try:
-                cache_time = datetime.fromisoformat(timestamp)
-                ttl = self.config.get('limits', {}).get('market_data_ttl_seconds', 300)
-                if datetime.now() - cache_time < timedelta(seconds=ttl):
-                    return price
-            except:
-                pass
+        # Check if cache is recent (within the TTL); rows written before
+        # ts_epoch existed have it NULL and count as stale
+        if row and row[1] is not None:
+            price, ts_epoch = row
+            ttl = self.config.get('limits', {}).get('market_data_ttl_seconds', 300)
+            if time.time() - ts_epoch < ttl:
+                return price
         
         # Fetch fresh data
         metrics = self._analyze_symbol(symbol)
@@ -402,36 +1069,17 @@ class MarketAnalyst:
         """
         Assess the current market regime for a symbol.
         
-        Returns: 'Trending Up', 'Trending Down', 'Ranging', or 'High Volatility'
-        """
-        if self.alpaca_client:
-            df = self._fetch_alpaca_data(symbol, days=60)
-        elif YFINANCE_AVAILABLE:
-            df = self._fetch_yfinance_data(symbol, period="90d")
-        else:
-            return "Unknown"
+        The regime comes out of _analyze_symbol, which reads the same
+        cached bar frame scan_symbols used: after a scan this makes no
+        further requests.
         
-        if df is None or len(df) < 50:
+        Returns: 'Trending Up', 'Trending Down', 'Ranging', 'High Volatility',
+        or 'Unknown'
+        """
+        metrics = self._analyze_symbol(symbol)
+        if not metrics:
             return "Unknown"
-        
-        current_price = df['Close'].iloc[-1]
-        sma_50 = df['Close'].rolling(50).mean().iloc[-1]
-        sma_20 = df['Close'].rolling(20).mean().iloc[-1]
-        
-        atr = self._calculate_atr(df) or 0
-        volatility_pct = atr / current_price if current_price > 0 else 0
-        
-        # High volatility override
-        if volatility_pct > 0.05:
-            return "High Volatility"
-        
-        # Trend detection
-        if current_price > sma_50 and sma_20 > sma_50:
-            return "Trending Up"
-        elif current_price < sma_50 and sma_20 < sma_50:
-            return "Trending Down"
-        else:
-            return "Ranging"
+        return metrics.get('regime', "Unknown")
     
     def populate_metadata(self, symbols: List[str]):
         """
@@ -442,43 +1090,58 @@ class MarketAnalyst:
             logger.warning("yfinance not available for metadata population")
             return
             
+        # One connection for the lookup and the write (for Turso, each
+        # get_connection is a new remote session)
+        unique_symbols = list(dict.fromkeys(symbols))
+        rows = []
         with get_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
-            count = 0
-            for symbol in symbols:
-                try:
-                    # Check if already exists and recent
-                    cursor.execute("SELECT last_updated FROM stock_metadata WHERE symbol = ?", (symbol,))
-                    row = cursor.fetchone()
-                    if row:
-                        continue  # Skip existing
-                    
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    
-                    sector = info.get('sector', 'Unknown')
-                    industry = info.get('industry', 'Unknown')
-                    name = info.get('longName', symbol)
-                    avg_vol = info.get('averageVolume', 0)
-                    
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO stock_metadata 
-                        (symbol, name, sector, industry, avg_volume_20d, last_updated)
-                        VALUES (?, ?, ?, ?, ?, datetime('now'))
-                    """, (symbol, name, sector, industry, avg_vol))
-                    
-                    count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error fetching metadata for {symbol}: {e}")
+            # Skip symbols that already have metadata: one IN query per chunk
+            # of symbols (kept under SQLite's bound-parameter limit)
+            existing = set()
+            for start in range(0, len(unique_symbols), SQL_IN_CHUNK_SIZE):
+                chunk = unique_symbols[start:start + SQL_IN_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT symbol FROM stock_metadata WHERE symbol IN ({placeholders})",
+                    chunk
+                )
+                existing.update(row[0] for row in cursor.fetchall())
+            
+            # Fetch concurrently with no transaction open; the write lock is
+            # only taken for the final executemany
+            missing = [symbol for symbol in unique_symbols if symbol not in existing]
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(missing))) as executor:
+                    rows = [row for row in executor.map(self._fetch_metadata, missing) if row]
             
-            conn.commit()
+            if rows:
+                cursor.executemany(_SQL_UPSERT_META, rows)
+                conn.commit()
+        
+        count = len(rows)
         if count > 0:
             logger.info(f"Populated metadata for {count} new symbols")
         else:
             logger.info("Metadata up to date for all symbols")
 
+    def _fetch_metadata(self, symbol: str) -> Optional[tuple]:
+        """Fetch one symbol's stock_metadata row from yfinance, or None."""
+        try:
+            info = _yf_ticker(symbol).info
+            
+            sector = info.get('sector', 'Unknown')
+            industry = info.get('industry', 'Unknown')
+            name = info.get('longName', symbol)
+            avg_vol = info.get('averageVolume', 0)
+            
+            return (symbol, name, sector, industry, avg_vol)
+            
+        except Exception as e:
+            logger.error(f"Error fetching metadata for {symbol}: {e}")
+            return None
+    
     def is_trading_day(self) -> bool:
         """
         Check if today is a trading day (Monday-Friday, non-holiday).
@@ -489,12 +1152,22 @@ class MarketAnalyst:
         tz_ny = pytz.timezone('America/New_York')
         today_ny = datetime.now(tz_ny).date()
 
+        cached = self._trading_day_cache.get(today_ny)
+        if cached is not None:
+            return cached
+
         if self.trading_client:
             try:
                 req = GetCalendarRequest(start=today_ny, end=today_ny)
                 calendar = self.trading_client.get_calendar(req)
                 # If we get a calendar entry for today, it's a trading day
-                return len(calendar) > 0
+                is_open = len(calendar) > 0
+                # Only calendar answers are cached; the weekday fallback
+                # below is free and would miss holidays
+                if len(self._trading_day_cache) > 7:
+                    self._trading_day_cache.clear()
+                self._trading_day_cache[today_ny] = is_open
+                return is_open
             except Exception as e:
                 logger.warning(f"Failed to check market calendar: {e}")
                 # Continue to fallback
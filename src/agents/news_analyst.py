@@ -8,13 +8,21 @@ Handles:
 - Urgency classification for notification routing
 """
 
+import hashlib
 import requests
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from src.data.db_connection import get_connection
 import json
 import logging
+import re
 import time
 
 from src.utils.gemini_client import call_with_retry
@@ -29,6 +37,228 @@ except ImportError:
     GEMINI_AVAILABLE = False
     logger.warning("google-generativeai not installed. AI features will be limited.")
 
+# orjson parses Gemini responses and cached results in C; its
+# JSONDecodeError subclasses json.JSONDecodeError, so handlers are shared
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+FINNHUB_NEWS_URL = "https://finnhub.io/api/v1/company-news"
+FINNHUB_GENERAL_NEWS_URL = "https://finnhub.io/api/v1/news"
+
+# news.mode: 'per_symbol' calls company-news for every symbol; 'firehose'
+# reads the general feed once and only calls company-news for symbols it
+# does not tag
+NEWS_MODES = ('per_symbol', 'firehose')
+
+# Symbols fetched concurrently (limits.news_fetch_workers); set to 1 to
+# fetch serially, e.g. to stay under the Finnhub rate limit
+DEFAULT_NEWS_FETCH_WORKERS = 8
+
+# Symbol groups analyzed concurrently (gemini.max_concurrent_calls); the
+# shared rate limiter in gemini_client still spaces out call starts
+DEFAULT_GEMINI_WORKERS = 4
+
+# Gemini sentiment for an identical article (same model, temperature,
+# symbol, headline and summary) is reused for this long
+SENTIMENT_CACHE_TTL_HOURS = 24
+
+# Sentiment results kept in-process in front of news_sentiment_cache;
+# the least recently used entry is evicted beyond this
+SENTIMENT_CACHE_MAX_ENTRIES = 2048
+
+# Statements as module constants: every call passes the identical string,
+# so the per-thread cached connection's statement cache skips re-parsing
+_SQL_INSERT_NEWS = """
+    INSERT INTO news_analysis
+    (symbol, headline, sentiment, confidence, implied_action, key_reason, urgency, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_UPSERT_SENTIMENT_CACHE = """
+    INSERT OR REPLACE INTO news_sentiment_cache (key, result_json, created_at)
+    VALUES (?, ?, ?)
+"""
+_SQL_RECENT_SENTIMENT = """
+    SELECT sentiment, confidence, implied_action, key_reason, urgency, timestamp
+    FROM news_analysis
+    WHERE symbol = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+_SQL_HIGH_URGENCY = """
+    SELECT symbol, headline, sentiment, confidence, implied_action, key_reason, timestamp
+    FROM news_analysis
+    WHERE urgency = 'high' AND timestamp > ?
+    ORDER BY timestamp DESC
+"""
+
+# Body of the first markdown code fence in a Gemini response: the opening
+# line (with any language tag) is skipped, an unclosed fence runs to the end
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)(?:```|\Z)", re.DOTALL)
+
+# Sentiment prompts, formatted per call with only the article fields
+_SENTIMENT_PROMPT = """You are a financial news analyst. Analyze this news headline and summary.
+
+Headline: {headline}
+Summary: {summary}
+Stock Ticker: {symbol}
+
+Extract the following in JSON format ONLY (no preamble, no markdown):
+{{
+  "sentiment": "positive" | "negative" | "neutral",
+  "confidence": 0.0-1.0,
+  "implied_action": "BUY" | "SELL" | "HOLD",
+  "key_reason": "brief explanation in 10 words or less",
+  "urgency": "high" | "medium" | "low"
+}}
+
+Guidelines:
+- sentiment: Overall tone of the news for the stock
+- confidence: How certain the sentiment classification is
+- implied_action: What a rational investor might consider
+- key_reason: The main takeaway in very few words
+- urgency: high = breaking/material news, medium = significant, low = routine
+
+Output ONLY the JSON, no other text."""
+
+_BATCH_ARTICLE = "\nArticle {index}:\n  Headline: {headline}\n  Summary: {summary}\n"
+
+_BATCH_SENTIMENT_PROMPT = """You are a financial news analyst. Analyze these {count} news articles for {symbol}.
+{articles}
+For EACH article, extract sentiment. Return a JSON array ONLY (no preamble, no markdown):
+[
+  {{
+    "article_index": 1,
+    "sentiment": "positive" | "negative" | "neutral",
+    "confidence": 0.0-1.0,
+    "implied_action": "BUY" | "SELL" | "HOLD",
+    "key_reason": "brief explanation in 10 words or less",
+    "urgency": "high" | "medium" | "low"
+  }}
+]
+
+Guidelines:
+- sentiment: Overall tone of each article for {symbol}
+- confidence: How certain the sentiment classification is
+- implied_action: What a rational investor might consider
+- key_reason: The main takeaway in very few words
+- urgency: high = breaking/material news, medium = significant, low = routine
+
+Output ONLY the JSON array, no other text."""
+
+# Values allowed by the news_analysis CHECK constraints
+_VALID_SENTIMENT = frozenset({'positive', 'negative', 'neutral'})
+_VALID_ACTION = frozenset({'BUY', 'SELL', 'HOLD'})
+_VALID_URGENCY = frozenset({'high', 'medium', 'low'})
+
+# Analysis fields stored per cached article
+_SENTIMENT_FIELDS = ('sentiment', 'confidence', 'implied_action', 'key_reason', 'urgency')
+
+
+def _enum_value(value: Any, valid: frozenset, default: str, case=str.lower) -> str:
+    """
+    Coerce a model-provided enum to one of the allowed values.
+    
+    Already-canonical strings pass straight through; others are stripped
+    and case-normalized, and anything still unrecognized becomes the default.
+    """
+    if not isinstance(value, str):
+        return default
+    if value in valid:
+        return value
+    value = case(value.strip())
+    return value if value in valid else default
+
+
+def _read_json_stream(chunks) -> str:
+    """
+    Concatenate streamed response text, stopping as soon as the first
+    top-level JSON object or array closes.
+    
+    Counting starts only at a '{' or '[' that begins a line (bare JSON, or
+    the body of a code fence), so brackets in leading prose such as
+    "Analysis [1 article]:" are ignored; brackets inside string literals
+    never count. If no value opens or it never closes, the whole text is
+    returned for the parsers' own fallbacks.
+    """
+    parts = []
+    depth = 0
+    line_start = True
+    in_string = escaped = False
+    for chunk in chunks:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunk without text parts (e.g. a safety or length stop)
+            continue
+        parts.append(text)
+        for i, char in enumerate(text):
+            if not depth:
+                if char in '{[' and line_start:
+                    depth = 1
+                elif char == '\n':
+                    line_start = True
+                elif not char.isspace():
+                    line_start = False
+            elif in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if not depth:
+                    parts[-1] = text[:i + 1]
+                    return ''.join(parts)
+            elif char == '"':
+                in_string = True
+    return ''.join(parts)
+
+
+def _news_item(symbol: str, item: Dict) -> Dict:
+    """News item for a symbol from a raw Finnhub article."""
+    return {
+        'symbol': symbol,
+        'headline': item.get('headline'),
+        'summary': item.get('summary'),
+        'source': item.get('source'),
+        'url': item.get('url'),
+        'published': item.get('datetime')
+    }
+
+
+def _dedupe_articles(items: List[Dict]) -> List[Dict]:
+    """Drop articles whose URL or case-insensitive headline was already seen, keeping order."""
+    seen_urls = set()
+    seen_headlines = set()
+    unique = []
+    for item in items:
+        url = item.get('url')
+        headline = (item.get('headline') or '').strip().casefold()
+        if (url and url in seen_urls) or (headline and headline in seen_headlines):
+            continue
+        if url:
+            seen_urls.add(url)
+        if headline:
+            seen_headlines.add(headline)
+        unique.append(item)
+    return unique
+
 
 class NewsAnalyst:
     """Agent responsible for news aggregation and sentiment analysis."""
@@ -62,6 +292,35 @@ class NewsAnalyst:
                 logger.info(f"Gemini {self.model_name} initialized for news analysis")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini: {e}")
+        
+        self.fetch_workers = max(1, int(
+            self.config.get('limits', {}).get('news_fetch_workers', DEFAULT_NEWS_FETCH_WORKERS)
+        ))
+        self.news_mode = self.config.get('news', {}).get('mode', 'per_symbol')
+        if self.news_mode not in NEWS_MODES:
+            logger.warning(f"Unknown news.mode '{self.news_mode}', using per_symbol")
+            self.news_mode = 'per_symbol'
+        self.gemini_workers = max(1, int(
+            self.config.get('gemini', {}).get('max_concurrent_calls', DEFAULT_GEMINI_WORKERS)
+        ))
+        
+        # One keep-alive session for all Finnhub calls, so concurrent fetches
+        # reuse TCP/TLS connections; rate limits and 5xx are retried with backoff
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.fetch_workers,
+            pool_maxsize=self.fetch_workers,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self._session.mount('https://', adapter)
+        
+        # content hash -> (cached_at, sentiment fields); see _get_cached_sentiments
+        self._sentiment_cache: OrderedDict[str, tuple] = OrderedDict()
+        self._sentiment_cache_lock = threading.Lock()
+        
+        # news_sentiment_cache is created once, on first database access
+        self._schema_checked = False
     
     def fetch_news(self, symbols: List[str], lookback_hours: int = 24) -> List[Dict]:
         """
@@ -79,43 +338,105 @@ class NewsAnalyst:
             return []
         
         all_news = []
-        from_date = self._get_from_date(lookback_hours)
-        to_date = datetime.now().strftime('%Y-%m-%d')
+        if not symbols:
+            return all_news
         
-        for symbol in symbols:
-            try:
-                url = "https://finnhub.io/api/v1/company-news"
-                params = {
-                    'symbol': symbol,
-                    'token': self.finnhub_key,
-                    'from': from_date,
-                    'to': to_date
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    news_items = response.json()
-                    
-                    max_articles = self.config.get('limits', {}).get('max_news_articles', 5)
-                    for item in news_items[:max_articles]:  # Limit per symbol
-                        all_news.append({
-                            'symbol': symbol,
-                            'headline': item.get('headline'),
-                            'summary': item.get('summary'),
-                            'source': item.get('source'),
-                            'url': item.get('url'),
-                            'published': item.get('datetime')
-                        })
-                else:
-                    logger.warning(f"Finnhub API error for {symbol}: {response.status_code}")
-                    
-            except Exception as e:
-                logger.error(f"Error fetching news for {symbol}: {e}")
+        # Firehose mode covers every symbol the general feed tags in one
+        # request; only the rest fall back to per-symbol company news
+        remaining = symbols
+        if self.news_mode == 'firehose':
+            all_news = self.fetch_news_firehose(symbols, lookback_hours)
+            covered = {item['symbol'] for item in all_news}
+            remaining = [symbol for symbol in symbols if symbol not in covered]
+        
+        if remaining:
+            from_date = self._get_from_date(lookback_hours)
+            to_date = datetime.now().strftime('%Y-%m-%d')
+            
+            # Results are collected in submission order so output stays grouped by symbol
+            with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(remaining))) as executor:
+                futures = [executor.submit(self._fetch_symbol_news, symbol, from_date, to_date)
+                           for symbol in remaining]
+                for future in futures:
+                    all_news.extend(future.result())
         
         logger.info(f"Fetched {len(all_news)} news items for {len(symbols)} symbols")
         return all_news
     
+    def fetch_news_firehose(self, symbols: List[str], lookback_hours: int = 24) -> List[Dict]:
+        """
+        Fetch Finnhub's general news feed once and keep articles tagged with
+        any of the given symbols.
+        
+        Args:
+            symbols: List of stock ticker symbols
+            lookback_hours: How many hours back to look for news
+            
+        Returns:
+            List of news items (same shape as fetch_news), one per article
+            and tagged symbol, at most max_news_articles per symbol
+        """
+        if not self.finnhub_key or not symbols:
+            return []
+        
+        try:
+            params = {'category': 'general', 'token': self.finnhub_key}
+            response = self._session.get(FINNHUB_GENERAL_NEWS_URL, params=params, timeout=10)
+            
+            if response.status_code != 200:
+                logger.warning(f"Finnhub general news error: {response.status_code}")
+                return []
+            
+            items = response.json()
+        except Exception as e:
+            logger.error(f"Error fetching general news: {e}")
+            return []
+        
+        by_ticker = {symbol.upper(): symbol for symbol in symbols}
+        cutoff = (datetime.now() - timedelta(hours=lookback_hours)).timestamp()
+        matched = defaultdict(list)
+        for item in items:
+            if (item.get('datetime') or 0) < cutoff:
+                continue
+            related = (item.get('related') or '').upper().split(',')
+            for ticker in by_ticker.keys() & {tag.strip() for tag in related}:
+                matched[by_ticker[ticker]].append(item)
+        
+        max_articles = self.config.get('limits', {}).get('max_news_articles', 5)
+        return [
+            _news_item(symbol, item)
+            for symbol in symbols if symbol in matched
+            for item in _dedupe_articles(matched[symbol])[:max_articles]
+        ]
+    
+    def _fetch_symbol_news(self, symbol: str, from_date: str, to_date: str) -> List[Dict]:
+        """Fetch company news for one symbol; errors are logged and yield no items."""
+        try:
+            params = {
+                'symbol': symbol,
+                'token': self.finnhub_key,
+                'from': from_date,
+                'to': to_date
+            }
+            
+            response = self._session.get(FINNHUB_NEWS_URL, params=params, timeout=10)
+            
+            if response.status_code != 200:
+                logger.warning(f"Finnhub API error for {symbol}: {response.status_code}")
+                return []
+            
+            # Reposted wire stories are dropped before the per-symbol limit,
+            # so they neither reach Gemini nor crowd out distinct articles
+            max_articles = self.config.get('limits', {}).get('max_news_articles', 5)
+            return [
+                _news_item(symbol, item)
+                for item in _dedupe_articles(response.json())[:max_articles]
+            ]
+        
+        except Exception as e:
+            logger.error(f"Error fetching news for {symbol}: {e}")
+            return []
+    
     def analyze_sentiment(self, news_item: Dict) -> Dict:
         """
         Use Gemini to extract structured sentiment from news text.
@@ -129,27 +450,24 @@ class NewsAnalyst:
         if not self.gemini_model:
             return self._fallback_sentiment(news_item)
         
+        key = self._sentiment_cache_key(news_item)
+        cached = self._get_cached_sentiments([key]).get(key)
+        if cached:
+            return self._cached_result(news_item, cached)
+        
         prompt = self._build_sentiment_prompt(news_item)
         symbol = news_item.get('symbol', 'Unknown')
         
-        def make_call():
-            return self.gemini_model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=200
-                )
-            )
+        response_text = self._generate_json(prompt, max_output_tokens=200, context=symbol)
         
-        response = call_with_retry(make_call, context=symbol)
-        
-        if response:
-            result = self._parse_json_response(response.text)
+        if response_text:
+            result = self._parse_json_response(response_text)
             if result:
                 result['symbol'] = symbol
                 result['headline'] = news_item['headline']
                 result['timestamp'] = datetime.now().isoformat()
                 self._write_to_db(result)
+                self._cache_sentiments({key: result})
                 return result
         
         return self._fallback_sentiment(news_item)
@@ -169,103 +487,80 @@ class NewsAnalyst:
         if not news_items:
             return []
 
-        analyses = []
-
         # Group articles by symbol for batched analysis
-        from collections import defaultdict
         by_symbol = defaultdict(list)
         for item in news_items:
             by_symbol[item['symbol']].append(item)
 
-        for i, (symbol, items) in enumerate(by_symbol.items()):
-            if self.gemini_model and len(items) > 1:
-                # Batch: analyze all articles for this symbol in one Gemini call
-                batch_results = self._analyze_symbol_batch(items)
-                analyses.extend(batch_results)
-            else:
-                # Single article or no AI: use per-article method
-                for item in items:
-                    analyses.append(self.analyze_sentiment(item))
+        # Symbol groups go to Gemini concurrently; results keep symbol order
+        groups = list(by_symbol.values())
+        analyses = []
+        with ThreadPoolExecutor(max_workers=min(self.gemini_workers, len(groups))) as executor:
+            futures = [executor.submit(self._analyze_group, items) for items in groups]
+            for future in futures:
+                analyses.extend(future.result())
 
         return analyses
     
+    def _analyze_group(self, items: List[Dict]) -> List[Dict]:
+        """Analyze one symbol's articles: one batch call, or per article when single or without AI."""
+        if self.gemini_model and len(items) > 1:
+            return self._analyze_symbol_batch(items)
+        return [self.analyze_sentiment(item) for item in items]
+    
     def _build_sentiment_prompt(self, news_item: Dict) -> str:
         """Build Chain-of-Thought prompt for sentiment extraction."""
-        return f"""You are a financial news analyst. Analyze this news headline and summary.
-
-Headline: {news_item.get('headline', 'N/A')}
-Summary: {news_item.get('summary', 'N/A')}
-Stock Ticker: {news_item.get('symbol', 'Unknown')}
-
-Extract the following in JSON format ONLY (no preamble, no markdown):
-{{
-  "sentiment": "positive" | "negative" | "neutral",
-  "confidence": 0.0-1.0,
-  "implied_action": "BUY" | "SELL" | "HOLD",
-  "key_reason": "brief explanation in 10 words or less",
-  "urgency": "high" | "medium" | "low"
-}}
-
-Guidelines:
-- sentiment: Overall tone of the news for the stock
-- confidence: How certain the sentiment classification is
-- implied_action: What a rational investor might consider
-- key_reason: The main takeaway in very few words
-- urgency: high = breaking/material news, medium = significant, low = routine
-
-Output ONLY the JSON, no other text."""
+        return _SENTIMENT_PROMPT.format(
+            headline=news_item.get('headline', 'N/A'),
+            summary=news_item.get('summary', 'N/A'),
+            symbol=news_item.get('symbol', 'Unknown')
+        )
     
     def _build_batch_sentiment_prompt(self, news_items: List[Dict]) -> str:
         """Build prompt to analyze multiple articles for the same symbol in one call."""
         symbol = news_items[0].get('symbol', 'Unknown')
 
-        articles_text = ""
-        for i, item in enumerate(news_items, 1):
-            headline = item.get('headline', 'N/A')
-            summary = (item.get('summary') or 'N/A')[:200]
-            articles_text += f"\nArticle {i}:\n  Headline: {headline}\n  Summary: {summary}\n"
-
-        return f"""You are a financial news analyst. Analyze these {len(news_items)} news articles for {symbol}.
-{articles_text}
-For EACH article, extract sentiment. Return a JSON array ONLY (no preamble, no markdown):
-[
-  {{
-    "article_index": 1,
-    "sentiment": "positive" | "negative" | "neutral",
-    "confidence": 0.0-1.0,
-    "implied_action": "BUY" | "SELL" | "HOLD",
-    "key_reason": "brief explanation in 10 words or less",
-    "urgency": "high" | "medium" | "low"
-  }}
-]
-
-Guidelines:
-- sentiment: Overall tone of each article for {symbol}
-- confidence: How certain the sentiment classification is
-- implied_action: What a rational investor might consider
-- key_reason: The main takeaway in very few words
-- urgency: high = breaking/material news, medium = significant, low = routine
+        articles_text = ''.join(
+            _BATCH_ARTICLE.format(
+                index=i,
+                headline=item.get('headline', 'N/A'),
+                summary=(item.get('summary') or 'N/A')[:200]
+            )
+            for i, item in enumerate(news_items, 1)
+        )
 
-Output ONLY the JSON array, no other text."""
+        return _BATCH_SENTIMENT_PROMPT.format(
+            count=len(news_items), symbol=symbol, articles=articles_text
+        )
 
     def _analyze_symbol_batch(self, news_items: List[Dict]) -> List[Dict]:
-        """Analyze all articles for one symbol in a single Gemini call."""
+        """
+        Analyze all articles for one symbol in a single Gemini call.
+        
+        Articles with a cached sentiment are answered from the cache; only
+        the rest go into the prompt, and no call is made if all are cached.
+        """
+        keys = [self._sentiment_cache_key(item) for item in news_items]
+        cached = self._get_cached_sentiments(keys)
+        misses = [item for item, key in zip(news_items, keys) if key not in cached]
+        fresh = iter(self._analyze_uncached_batch(misses) if misses else [])
+        
+        return [
+            self._cached_result(item, cached[key]) if key in cached else next(fresh)
+            for item, key in zip(news_items, keys)
+        ]
+    
+    def _analyze_uncached_batch(self, news_items: List[Dict]) -> List[Dict]:
+        """Send one batch prompt for articles that missed the sentiment cache."""
         symbol = news_items[0].get('symbol', 'Unknown')
         prompt = self._build_batch_sentiment_prompt(news_items)
 
-        def make_call():
-            return self.gemini_model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=200 * len(news_items)
-                )
-            )
-
-        response = call_with_retry(make_call, context=f"{symbol}_batch")
+        response_text = self._generate_json(
+            prompt, max_output_tokens=200 * len(news_items), context=f"{symbol}_batch"
+        )
 
-        if response:
-            results = self._parse_batch_response(response.text, news_items)
+        if response_text:
+            results = self._parse_batch_response(response_text, news_items)
             if results:
                 return results
 
@@ -273,16 +568,36 @@ Output ONLY the JSON array, no other text."""
         logger.warning(f"Batch sentiment failed for {symbol}, using fallback")
         return [self._fallback_sentiment(item) for item in news_items]
 
+    def _generate_json(self, prompt: str, max_output_tokens: int, context: str) -> Optional[str]:
+        """
+        Stream a Gemini response and return its text up to the end of the
+        first top-level JSON value, or None if the call failed.
+        
+        Reading happens inside the retried call, so errors raised mid-stream
+        are retried like any other.
+        """
+        def make_call():
+            stream = self.gemini_model.generate_content(
+                prompt,
+                generation_config=genai.GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=max_output_tokens
+                ),
+                stream=True
+            )
+            return _read_json_stream(stream)
+        
+        return call_with_retry(make_call, context=context)
+
     def _parse_batch_response(self, response_text: str, news_items: List[Dict]) -> Optional[List[Dict]]:
         """Parse a JSON array response from batch sentiment analysis."""
         symbol = news_items[0].get('symbol', 'Unknown')
 
-        # Try to extract JSON array
+        # Try to extract JSON array, from inside a code fence if there is one
         text = response_text.strip()
-        if text.startswith('```'):
-            lines = text.split('\n', 1)
-            text = lines[1] if len(lines) > 1 else text
-            text = text.rsplit('```', 1)[0].strip()
+        fence = _FENCE_RE.search(text)
+        if fence:
+            text = fence.group(1)
 
         # Find array bounds
         start = text.find('[')
@@ -292,7 +607,7 @@ Output ONLY the JSON array, no other text."""
             return None
 
         try:
-            parsed = json.loads(text[start:end])
+            parsed = _json_loads(text[start:end])
         except json.JSONDecodeError:
             logger.warning(f"Failed to parse batch JSON for {symbol}")
             return None
@@ -306,8 +621,9 @@ Output ONLY the JSON array, no other text."""
             logger.warning(f"Batch response for {symbol} contained no valid entries")
             return None
 
-        # Map results back to articles and write to DB
+        # Map results back to articles; parsed ones are written in one batch
         results = []
+        analyzed = []
         for i, item in enumerate(news_items):
             # Find matching result by article_index or position
             matched = None
@@ -329,38 +645,143 @@ Output ONLY the JSON array, no other text."""
                     'urgency': matched.get('urgency', 'low'),
                     'timestamp': datetime.now().isoformat()
                 }
-                self._write_to_db(result)
+                analyzed.append((self._sentiment_cache_key(item), result))
                 results.append(result)
             else:
                 results.append(self._fallback_sentiment(item))
 
+        self._write_many_to_db([result for _, result in analyzed])
+        self._cache_sentiments(dict(analyzed))
         return results
 
+    def _sentiment_cache_key(self, news_item: Dict) -> str:
+        """Content hash identifying an article's sentiment under the current model settings."""
+        content = (f"{self.model_name}|{self.temperature}|{news_item.get('symbol')}|"
+                   f"{news_item.get('headline')}|{news_item.get('summary')}")
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    def _get_cached_sentiments(self, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Look up cached sentiment fields by content hash.
+        
+        The in-process cache is checked first; remaining keys are read from
+        news_sentiment_cache in one query and promoted into it.
+        """
+        now = time.time()
+        ttl = SENTIMENT_CACHE_TTL_HOURS * 3600
+        found = {}
+        with self._sentiment_cache_lock:
+            for key in keys:
+                entry = self._sentiment_cache.get(key)
+                if entry is None:
+                    continue
+                if now - entry[0] >= ttl:
+                    del self._sentiment_cache[key]
+                    continue
+                self._sentiment_cache.move_to_end(key)
+                found[key] = entry[1]
+        
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if not missing:
+            return found
+        
+        cutoff = (datetime.now() - timedelta(hours=SENTIMENT_CACHE_TTL_HOURS)).isoformat()
+        placeholders = ','.join('?' * len(missing))
+        with get_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._ensure_schema(cursor)
+            cursor.execute(f"""
+                SELECT key, result_json, created_at
+                FROM news_sentiment_cache
+                WHERE key IN ({placeholders}) AND created_at > ?
+            """, (*missing, cutoff))
+            rows = cursor.fetchall()
+        
+        with self._sentiment_cache_lock:
+            for key, result_json, created_at in rows:
+                fields = _json_loads(result_json)
+                found[key] = fields
+                self._remember_sentiment(key, datetime.fromisoformat(created_at).timestamp(), fields)
+        return found
+    
+    def _cache_sentiments(self, analyses: Dict[str, Dict]):
+        """Store Gemini results by content hash in memory and in news_sentiment_cache."""
+        if not analyses:
+            return
+        now = datetime.now()
+        entries = {key: {field: result.get(field) for field in _SENTIMENT_FIELDS}
+                   for key, result in analyses.items()}
+        
+        with self._sentiment_cache_lock:
+            for key, fields in entries.items():
+                self._remember_sentiment(key, now.timestamp(), fields)
+        
+        with get_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._ensure_schema(cursor)
+            cursor.executemany(_SQL_UPSERT_SENTIMENT_CACHE, [(key, _json_dumps(fields), now.isoformat()) for key, fields in entries.items()])
+            conn.commit()
+    
+    def _remember_sentiment(self, key: str, cached_at: float, fields: Dict):
+        """Insert into the in-process LRU; caller holds _sentiment_cache_lock."""
+        self._sentiment_cache[key] = (cached_at, fields)
+        self._sentiment_cache.move_to_end(key)
+        while len(self._sentiment_cache) > SENTIMENT_CACHE_MAX_ENTRIES:
+            self._sentiment_cache.popitem(last=False)
+    
+    def _cached_result(self, news_item: Dict, fields: Dict) -> Dict:
+        """Build an analysis dict for an article from its cached sentiment fields."""
+        return {
+            'symbol': news_item.get('symbol', 'Unknown'),
+            'headline': news_item.get('headline', ''),
+            **fields,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _ensure_schema(self, cursor):
+        """
+        Create news_sentiment_cache and the news_analysis lookup indexes in
+        databases initialized without them.
+        
+        (symbol, timestamp DESC) serves get_recent_sentiment as an index seek
+        with the ORDER BY already satisfied; the partial high-urgency index
+        holds only the rows get_high_urgency_news can return.
+        """
+        if self._schema_checked:
+            return
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS news_sentiment_cache (
+                key TEXT PRIMARY KEY,
+                result_json TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_analysis'")
+        if cursor.fetchone():
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_news_symbol "
+                "ON news_analysis(symbol, timestamp DESC)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_news_high_urgency "
+                "ON news_analysis(timestamp DESC) WHERE urgency = 'high'"
+            )
+        self._schema_checked = True
+    
     def _parse_json_response(self, response_text: str) -> Optional[Dict]:
         """Parse JSON from Gemini response, handling common issues."""
         try:
             # Try direct parse first
-            return json.loads(response_text)
+            return _json_loads(response_text)
         except json.JSONDecodeError:
             pass
         
         # Try to extract JSON from markdown code block
         text = response_text.strip()
-        if '```' in text:
-            lines = text.split('\n')
-            json_lines = []
-            in_json = False
-            for line in lines:
-                if line.startswith('```') and not in_json:
-                    in_json = True
-                    continue
-                elif line.startswith('```') and in_json:
-                    break
-                elif in_json:
-                    json_lines.append(line)
-            
+        fence = _FENCE_RE.search(text)
+        if fence:
             try:
-                return json.loads('\n'.join(json_lines))
+                return _json_loads(fence.group(1))
             except json.JSONDecodeError:
                 pass
 
@@ -369,7 +790,7 @@ Output ONLY the JSON array, no other text."""
         end = text.rfind('}') + 1
         if start != -1 and end > start:
             try:
-                return json.loads(text[start:end])
+                return _json_loads(text[start:end])
             except json.JSONDecodeError:
                 pass
         
@@ -390,39 +811,35 @@ Output ONLY the JSON array, no other text."""
         }
     
     def _write_to_db(self, analysis: Dict):
-        """Store news analysis in database."""
-        # Sanitize enum fields to match DB CHECK constraints
-        sentiment = str(analysis.get('sentiment', 'neutral')).lower().strip()
-        if sentiment not in ('positive', 'negative', 'neutral'):
-            sentiment = 'neutral'
-        action = str(analysis.get('implied_action', 'HOLD')).upper().strip()
-        if action not in ('BUY', 'SELL', 'HOLD'):
-            action = 'HOLD'
-        urgency = str(analysis.get('urgency', 'low')).lower().strip()
-        if urgency not in ('high', 'medium', 'low'):
-            urgency = 'low'
-
+        """Store one news analysis in database."""
+        self._write_many_to_db([analysis])
+    
+    def _write_many_to_db(self, analyses: List[Dict]):
+        """Store news analyses with one executemany and a single commit."""
+        if not analyses:
+            return
+        
+        rows = [self._analysis_row(analysis) for analysis in analyses]
         with get_connection(self.db_path) as conn:
             cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO news_analysis
-                (symbol, headline, sentiment, confidence, implied_action, key_reason, urgency, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                analysis.get('symbol'),
-                analysis.get('headline'),
-                sentiment,
-                analysis.get('confidence'),
-                action,
-                analysis.get('key_reason'),
-                urgency,
-                analysis.get('timestamp')
-            ))
-            
+            cursor.executemany(_SQL_INSERT_NEWS, rows)
             conn.commit()
         
-        logger.debug(f"Wrote news analysis for {analysis.get('symbol')} to database")
+        logger.debug(f"Wrote {len(rows)} news analyses for {analyses[0].get('symbol')} to database")
+    
+    @staticmethod
+    def _analysis_row(analysis: Dict) -> tuple:
+        """news_analysis insert parameters, with enums sanitized to match the CHECK constraints."""
+        return (
+            analysis.get('symbol'),
+            analysis.get('headline'),
+            _enum_value(analysis.get('sentiment'), _VALID_SENTIMENT, 'neutral'),
+            analysis.get('confidence'),
+            _enum_value(analysis.get('implied_action'), _VALID_ACTION, 'HOLD', str.upper),
+            analysis.get('key_reason'),
+            _enum_value(analysis.get('urgency'), _VALID_URGENCY, 'low'),
+            analysis.get('timestamp')
+        )
     
     def _get_from_date(self, hours: int) -> str:
         """Get date string for lookback period."""
@@ -442,14 +859,9 @@ Output ONLY the JSON array, no other text."""
         """
         with get_connection(self.db_path) as conn:
             cursor = conn.cursor()
+            self._ensure_schema(cursor)
             
-            cursor.execute("""
-                SELECT sentiment, confidence, implied_action, key_reason, urgency, timestamp
-                FROM news_analysis
-                WHERE symbol = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (symbol.upper(), limit))
+            cursor.execute(_SQL_RECENT_SENTIMENT, (symbol.upper(), limit))
             
             rows = cursor.fetchall()
         
@@ -469,15 +881,11 @@ Output ONLY the JSON array, no other text."""
         """Get all high-urgency news in recent period."""
         with get_connection(self.db_path) as conn:
             cursor = conn.cursor()
+            self._ensure_schema(cursor)
             
             cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
             
-            cursor.execute("""
-                SELECT symbol, headline, sentiment, confidence, implied_action, key_reason, timestamp
-                FROM news_analysis
-                WHERE urgency = 'high' AND timestamp > ?
-                ORDER BY timestamp DESC
-            """, (cutoff,))
+            cursor.execute(_SQL_HIGH_URGENCY, (cutoff,))
             
             rows = cursor.fetchall()
         
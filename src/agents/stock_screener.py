@@ -17,6 +17,8 @@ import requests
 import logging
 import math
 import re  # New import
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
@@ -377,54 +379,65 @@ class StockScreener:
     
     def _enrich_atr(self, candidates: List[Dict], symbols: List[str]):
         """Fetch ATR data for symbols using historical bars."""
+        symbols = symbols[:10]  # Limit to avoid rate limits
+        
+        # One bars request per symbol; overlap the round-trips
+        with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+            atrs = dict(zip(symbols, executor.map(self._fetch_atr, symbols)))
+        
+        for c in candidates:
+            atr = atrs.get(c['symbol'])
+            if atr is not None and not c.get('atr'):
+                c['atr'] = atr
+                logger.debug(f"Enriched {c['symbol']} with ATR ${atr:.2f}")
+    
+    def _fetch_atr(self, symbol: str) -> Optional[float]:
+        """Fetch 20 days of bars for one symbol and return its 14-day ATR."""
         from alpaca.data.requests import StockBarsRequest
         from alpaca.data.timeframe import TimeFrame
         
-        for symbol in symbols[:10]:  # Limit to avoid rate limits
-            try:
-                request = StockBarsRequest(
-                    symbol_or_symbols=symbol,
-                    timeframe=TimeFrame.Day,
-                    start=datetime.now() - timedelta(days=20)
-                )
-                bars = self.alpaca_client.get_stock_bars(request)
-                
-                if not bars:
-                    continue
-                
-                # Extract DataFrame
-                df = None
-                if hasattr(bars, 'df') and not bars.df.empty:
-                    df = bars.df
-                    if hasattr(df.index, 'get_level_values'):
-                        if symbol in df.index.get_level_values(0):
-                            df = df.loc[symbol]
-                elif symbol in bars:
-                    df = bars[symbol].df
-                
-                if df is not None and len(df) >= 14:
-                    # Calculate ATR
-                    high = df['high'] if 'high' in df.columns else df['High']
-                    low = df['low'] if 'low' in df.columns else df['Low']
-                    close = df['close'] if 'close' in df.columns else df['Close']
-                    
-                    high_low = high - low
-                    high_close = (high - close.shift()).abs()
-                    low_close = (low - close.shift()).abs()
-                    
-                    import pandas as pd
-                    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-                    atr = float(true_range.rolling(14).mean().iloc[-1])
+        try:
+            request = StockBarsRequest(
+                symbol_or_symbols=symbol,
+                timeframe=TimeFrame.Day,
+                start=datetime.now() - timedelta(days=20)
+            )
+            bars = self.alpaca_client.get_stock_bars(request)
+            
+            if not bars:
+                return None
+            
+            # Extract DataFrame
+            df = None
+            if hasattr(bars, 'df') and not bars.df.empty:
+                df = bars.df
+                if hasattr(df.index, 'get_level_values'):
+                    if symbol in df.index.get_level_values(0):
+                        df = df.loc[symbol]
+            elif symbol in bars:
+                df = bars[symbol].df
+            
+            if df is None or len(df) < 14:
+                return None
+            
+            # Calculate ATR (14-bar mean of the true range)
+            high = (df['high'] if 'high' in df.columns else df['High']).to_numpy(dtype=float)
+            low = (df['low'] if 'low' in df.columns else df['Low']).to_numpy(dtype=float)
+            close = (df['close'] if 'close' in df.columns else df['Close']).to_numpy(dtype=float)
+            
+            # The first bar has no previous close: its true range is High-Low
+            true_range = high - low
+            prev_close = close[:-1]
+            true_range[1:] = np.maximum.reduce([
+                true_range[1:],
+                np.abs(high[1:] - prev_close),
+                np.abs(low[1:] - prev_close)
+            ])
+            return float(true_range[-14:].mean())
                     
-                    # Update candidate
-                    for c in candidates:
-                        if c['symbol'] == symbol:
-                            c['atr'] = atr
-                            logger.debug(f"Enriched {symbol} with ATR ${atr:.2f}")
-                            break
-                            
-            except Exception as e:
-                logger.debug(f"Failed to fetch ATR for {symbol}: {e}")
+        except Exception as e:
+            logger.debug(f"Failed to fetch ATR for {symbol}: {e}")
+            return None
 
     def _apply_filters(self, candidates: List[Dict], watchlist: set) -> List[Dict]:
         """
@@ -45,7 +45,12 @@ def get_market_analyst():
     # Get keys from env (preferred) or config.yaml api_keys section
     alpaca_key = os.getenv("ALPACA_API_KEY") or api_keys.get('alpaca_api_key')
     alpaca_secret = os.getenv("ALPACA_SECRET_KEY") or api_keys.get('alpaca_secret_key')
-    return MarketAnalyst(db_path, alpaca_key, alpaca_secret, ma_config)
+    market_analyst = MarketAnalyst(db_path, alpaca_key, alpaca_secret, ma_config)
+    try:
+        yield market_analyst
+    finally:
+        # Built per request: free its API worker pool when the request ends
+        market_analyst.close()
 
 def get_portfolio_accountant():
     from src.agents.portfolio_accountant import PortfolioAccountant
@@ -77,8 +82,11 @@ def get_trade_advisor():
     alpaca_secret = os.getenv("ALPACA_SECRET_KEY") or api_keys.get('alpaca_secret_key')
 
     market_analyst = MarketAnalyst(db_path, alpaca_key, alpaca_secret, ma_config)
-
-    return TradeAdvisor(db_path, gemini_key, config, market_analyst)
+    try:
+        yield TradeAdvisor(db_path, gemini_key, config, market_analyst)
+    finally:
+        # Built per request: free its API worker pool when the request ends
+        market_analyst.close()
 
 def get_recommendation_evaluator():
     from src.agents.recommendation_evaluator import RecommendationEvaluator
@@ -5,6 +5,7 @@ import os
 import tempfile
 from datetime import datetime, timedelta
 from collections import Counter
+from contextlib import contextmanager
 from fastapi import APIRouter, Request, UploadFile, File
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse, RedirectResponse
@@ -168,8 +169,9 @@ async def chat_api(request: Request):
         if not question:
             return JSONResponse({"error": "Question is required"}, status_code=400)
 
-        ta = get_trade_advisor()
-        result = ta.ask(question)
+        # get_trade_advisor is a yield dependency; closes its MarketAnalyst on exit
+        with contextmanager(get_trade_advisor)() as ta:
+            result = ta.ask(question)
         return JSONResponse(result)
 
     except Exception as e:
@@ -6,6 +6,7 @@ take effect without restarting the process.
 """
 import os
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
 from typing import Generator, Any
@@ -26,11 +27,119 @@ def _get_db_config():
     }
 
 
+class _ThreadConnections(dict):
+    """
+    One thread's cached local connections, keyed by (db_path, inode).
+
+    Lives in thread-local storage, so it is dropped when its thread exits
+    and the connections are closed then; close_thread_connections closes
+    them earlier.
+    """
+
+    def close_all(self):
+        for conn in self.values():
+            conn.close()
+        self.clear()
+
+    def __del__(self):
+        self.close_all()
+
+
+# Per-thread state: cached connections, and the keys currently checked out
+_local = threading.local()
+
+
+def _thread_connections() -> _ThreadConnections:
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = _ThreadConnections()
+    return conns
+
+
+def _get_cached_conn(db_path: str, inode: int) -> sqlite3.Connection:
+    """
+    Return this thread's connection to db_path, opening it on first use.
+
+    One connection per (path, file) per thread: sqlite3 connections are
+    bound to the thread that created them, and every worker thread keeps
+    its own for as long as it lives. The inode is part of the key so a
+    deleted and recreated database file gets a fresh connection; the one
+    to the old file is closed.
+    """
+    conns = _thread_connections()
+    conn = conns.get((db_path, inode))
+    if conn is not None:
+        return conn
+
+    for key in [key for key in conns if key[0] == db_path]:
+        conns.pop(key).close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Under WAL, NORMAL only syncs at checkpoints; commits stay atomic and
+    # durable across application crashes
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
+    # The connection outlives each block, so its page cache stays warm:
+    # allow up to 64 MiB, and keep temp b-trees (sorts, indexes) in memory
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conns[(db_path, inode)] = conn
+    return conn
+
+
+def close_thread_connections():
+    """Close the calling thread's cached local connections."""
+    conns = getattr(_local, 'conns', None)
+    if conns is not None:
+        conns.close_all()
+
+
+@contextmanager
+def _local_connection(db_path: str) -> Generator[sqlite3.Connection, None, None]:
+    """
+    Yield a cached local connection, falling back to a fresh one when the
+    file does not exist yet or the cached one is already in use (nested
+    get_connection calls in the same thread).
+
+    On exit the cached connection is returned to a clean state: uncommitted
+    work is rolled back, as closing the connection would have done.
+    """
+    try:
+        inode = os.stat(db_path).st_ino
+    except OSError:
+        inode = None
+
+    in_use = _local.__dict__.setdefault('in_use', set())
+    key = (db_path, inode)
+
+    if inode is None or key in in_use:
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    conn = _get_cached_conn(db_path, inode)
+    in_use.add(key)
+    try:
+        yield conn
+    finally:
+        in_use.discard(key)
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+
+
 @contextmanager
 def get_connection(db_path: str = None) -> Generator[Any, None, None]:
     """
     Get database connection based on DB_MODE environment variable.
 
+    Local connections are cached per thread and stay open after the block
+    exits; uncommitted changes are rolled back just as on close.
+
     Args:
         db_path: Path to local SQLite database (used when DB_MODE='local')
 
@@ -43,19 +152,19 @@ def get_connection(db_path: str = None) -> Generator[Any, None, None]:
         import libsql_experimental as libsql
         # For Turso, we use the specific URL and token
         conn = libsql.connect(config['turso_url'], auth_token=config['turso_token'])
+        try:
+            yield conn
+        finally:
+            conn.close()
     else:
         # Fallback to local SQLite
         if not db_path:
              # Try to find a default if not provided
             project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             db_path = os.path.join(project_root, 'data', 'agent.db')
-            
-        conn = sqlite3.connect(db_path)
 
-    try:
-        yield conn
-    finally:
-        conn.close()
+        with _local_connection(str(db_path)) as conn:
+            yield conn
 
 
 def get_db_mode() -> str:
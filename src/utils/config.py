@@ -5,6 +5,7 @@ Loads configuration from YAML file with environment variable substitution.
 """
 
 import os
+import pickle
 import re
 import yaml
 from pathlib import Path
@@ -62,8 +63,7 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
     
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config = _load_yaml_cached(str(config_path))
     
     # Substitute environment variables
     config = _substitute_env_vars(config)
@@ -71,6 +71,43 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     return config
 
 
+def _load_yaml_cached(config_path: str) -> Any:
+    """
+    Parse a YAML file, reusing a pickled sidecar (<file>.pkl) when it is
+    at least as new as the YAML source.
+    
+    The raw parse result is cached (before env var substitution) so
+    environment changes still take effect. Cache write failures are
+    ignored, e.g. on read-only deployments.
+    """
+    pkl_path = config_path + '.pkl'
+    
+    try:
+        if os.path.getmtime(pkl_path) >= os.path.getmtime(config_path):
+            with open(pkl_path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    
+    # Prefer the libyaml C loader when available; fall back to pure Python
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=loader)
+    
+    tmp_path = f"{pkl_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pkl_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    
+    return config
+
+
 def get_db_path(config: Optional[Dict] = None) -> str:
     """
     Get the database path from config, resolving relative paths.
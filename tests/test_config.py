@@ -0,0 +1,46 @@
+"""
+Unit Tests for Configuration Loader
+"""
+
+import os
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from utils.config import load_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Write a small config file."""
+    path = tmp_path / "config.yaml"
+    path.write_text('api_keys:\n  gemini_api_key: "${TEST_CONFIG_KEY}"\nrisk:\n  max_position_size_pct: 0.20\n')
+    return path
+
+
+def test_load_config_writes_pickle_sidecar(config_file):
+    config = load_config(str(config_file))
+    assert config['risk']['max_position_size_pct'] == 0.20
+    assert Path(str(config_file) + '.pkl').exists()
+
+
+def test_load_config_substitutes_env_after_cache(config_file, monkeypatch):
+    load_config(str(config_file))
+
+    monkeypatch.setenv('TEST_CONFIG_KEY', 'abc123')
+    config = load_config(str(config_file))
+    assert config['api_keys']['gemini_api_key'] == 'abc123'
+
+
+def test_load_config_ignores_stale_pickle(config_file):
+    load_config(str(config_file))
+
+    config_file.write_text('risk:\n  max_position_size_pct: 0.10\n')
+    pkl_mtime = os.path.getmtime(str(config_file) + '.pkl')
+    os.utime(config_file, (pkl_mtime + 10, pkl_mtime + 10))
+
+    config = load_config(str(config_file))
+    assert config['risk']['max_position_size_pct'] == 0.10
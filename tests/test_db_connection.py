@@ -0,0 +1,119 @@
+"""
+Unit Tests for Database Connection Adapter
+"""
+
+import os
+import sqlite3
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.db_connection import get_connection
+
+
+@pytest.fixture
+def local_db(tmp_path, monkeypatch):
+    """Create a local database with a single table."""
+    monkeypatch.setenv('DB_MODE', 'local')
+    db_path = str(tmp_path / 'test.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_local_connection_is_reused(local_db):
+    with get_connection(local_db) as first:
+        pass
+    with get_connection(local_db) as second:
+        pass
+    assert first is second
+
+
+def test_uncommitted_changes_are_rolled_back(local_db):
+    with get_connection(local_db) as conn:
+        conn.execute("INSERT INTO items VALUES ('uncommitted')")
+
+    with get_connection(local_db) as conn:
+        conn.execute("INSERT INTO items VALUES ('committed')")
+        conn.commit()
+
+    with get_connection(local_db) as conn:
+        rows = conn.execute("SELECT name FROM items").fetchall()
+    assert rows == [('committed',)]
+
+
+def test_row_factory_is_reset(local_db):
+    with get_connection(local_db) as conn:
+        conn.row_factory = sqlite3.Row
+
+    with get_connection(local_db) as conn:
+        assert conn.row_factory is None
+
+
+def test_nested_use_gets_separate_connection(local_db):
+    with get_connection(local_db) as outer:
+        with get_connection(local_db) as inner:
+            assert inner is not outer
+
+
+def test_recreated_file_gets_fresh_connection(local_db):
+    with get_connection(local_db) as first:
+        pass
+
+    replacement = local_db + '.new'
+    conn = sqlite3.connect(replacement)
+    conn.execute("CREATE TABLE other (value INTEGER)")
+    conn.commit()
+    conn.close()
+    os.replace(replacement, local_db)
+
+    with get_connection(local_db) as second:
+        tables = second.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+    assert second is not first
+    assert tables == [('other',)]
+
+
+def test_cached_connection_pragmas(local_db):
+    with get_connection(local_db) as conn:
+        assert conn.execute("PRAGMA cache_size").fetchone() == (-65536,)
+        assert conn.execute("PRAGMA temp_store").fetchone() == (2,)  # MEMORY
+        assert conn.execute("PRAGMA synchronous").fetchone() == (1,)  # NORMAL
+
+
+def test_each_worker_thread_keeps_its_connection(local_db):
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    seen = {}
+    barrier = threading.Barrier(12)
+
+    def use(_):
+        barrier.wait()
+        for _ in range(3):
+            with get_connection(local_db) as conn:
+                seen.setdefault(threading.get_ident(), set()).add(id(conn))
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(use, range(12)))
+
+    # More threads than any fixed cache size, and none reopened mid-run
+    assert len(seen) == 12
+    assert all(len(ids) == 1 for ids in seen.values())
+
+
+def test_close_thread_connections(local_db):
+    from src.data.db_connection import close_thread_connections
+
+    with get_connection(local_db) as first:
+        pass
+    close_thread_connections()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
+    with get_connection(local_db) as second:
+        assert second is not first
@@ -0,0 +1,570 @@
+"""
+Unit Tests for Market Analyst Agent
+"""
+
+import asyncio
+import pytest
+import sqlite3
+import tempfile
+import os
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from agents.market_analyst import MarketAnalyst
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database with the market data tables."""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE market_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            price DECIMAL(10, 4),
+            atr DECIMAL(10, 4),
+            sma_50 DECIMAL(10, 4),
+            volume INTEGER,
+            is_volatile INTEGER DEFAULT 0,
+            source TEXT
+        );
+
+        CREATE TABLE stock_metadata (
+            symbol TEXT PRIMARY KEY,
+            name TEXT,
+            sector TEXT,
+            industry TEXT,
+            avg_volume_20d INTEGER,
+            last_updated DATETIME
+        );
+    """)
+    conn.commit()
+    conn.close()
+
+    yield db_path
+
+    os.unlink(db_path)
+
+
+@pytest.fixture
+def analyst(temp_db, monkeypatch):
+    """Market analyst with network fetches replaced by canned metrics."""
+    ma = MarketAnalyst(temp_db)
+
+    def fake_analyze(symbol, **kwargs):
+        if symbol == 'FAIL':
+            raise RuntimeError("boom")
+        if symbol == 'NONE':
+            return None
+        return {
+            'price': 100.0,
+            'atr': 2.0,
+            'sma_50': 95.0,
+            'avg_volume': 1000,
+            'is_volatile': False,
+            'source': 'Test',
+            'timestamp': '2025-01-02T10:00:00'
+        }
+
+    monkeypatch.setattr(ma, '_analyze_symbol', fake_analyze)
+    monkeypatch.setattr(ma, '_prefetch_bars', lambda symbols: None)
+    return ma
+
+
+def test_ascan_symbols_collects_and_persists(analyst, temp_db):
+    results = asyncio.run(analyst.ascan_symbols(['AAPL', 'FAIL', 'NONE', 'MSFT']))
+
+    assert set(results) == {'AAPL', 'MSFT'}
+
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute("SELECT symbol FROM market_data ORDER BY symbol").fetchall()
+    conn.close()
+    assert rows == [('AAPL',), ('MSFT',)]
+
+
+def test_ascan_symbols_writes_off_the_event_loop(analyst, monkeypatch):
+    import threading
+    write_threads = []
+    monkeypatch.setattr(analyst, '_write_many_to_db',
+                        lambda results: write_threads.append(threading.current_thread()))
+
+    results = asyncio.run(analyst.ascan_symbols(['MSFT', 'NONE', 'AAPL']))
+
+    assert list(results) == ['MSFT', 'AAPL']
+    assert write_threads and write_threads[0] is not threading.main_thread()
+
+
+def test_scan_symbols_sync_shim(analyst):
+    results = analyst.scan_symbols(['AAPL', 'FAIL'])
+    assert list(results) == ['AAPL']
+
+
+def test_scan_symbols_inside_event_loop(analyst):
+    async def call_from_loop():
+        return analyst.scan_symbols(['MSFT'])
+
+    results = asyncio.run(call_from_loop())
+    assert list(results) == ['MSFT']
+
+
+def _daily_bars(symbols, days=60):
+    """Alpaca-style bars frame: MultiIndex (symbol, timestamp), lowercase columns."""
+    import pandas as pd
+    index = pd.MultiIndex.from_product(
+        [symbols, pd.date_range('2025-01-01', periods=days, freq='D')],
+        names=['symbol', 'timestamp']
+    )
+    n = len(index)
+    return pd.DataFrame({
+        'open': [100.0] * n,
+        'high': [101.0 + (i % 5) for i in range(n)],
+        'low': [99.0 - (i % 3) for i in range(n)],
+        'close': [100.0 + (i % 7) for i in range(n)],
+        'volume': [1000] * n,
+    }, index=index)
+
+
+class _FakeBars:
+    def __init__(self, df):
+        self.df = df
+
+
+class _FakeAlpacaClient:
+    """Records bar requests and answers with synthetic data."""
+
+    def __init__(self, symbols_with_data):
+        self.symbols_with_data = symbols_with_data
+        self.requests = []
+
+    def get_stock_bars(self, request):
+        self.requests.append(request.symbol_or_symbols)
+        return _FakeBars(_daily_bars(self.symbols_with_data))
+
+
+def test_scan_symbols_fetches_bars_in_one_request(temp_db):
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = _FakeAlpacaClient(['AAPL', 'MSFT'])
+
+    results = ma.scan_symbols(['AAPL', 'MSFT'])
+
+    assert len(ma.alpaca_client.requests) == 1
+    assert set(results) == {'AAPL', 'MSFT'}
+    assert results['AAPL']['sma_50'] is not None
+    assert results['AAPL']['atr'] is not None
+
+
+def test_fetch_alpaca_data_bulk_splits_per_symbol(temp_db):
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = _FakeAlpacaClient(['AAPL', 'MSFT'])
+
+    frames = ma._fetch_alpaca_data_bulk(['AAPL', 'MSFT', 'GOOG'])
+
+    assert set(frames) == {'AAPL', 'MSFT'}
+    assert list(frames['AAPL'].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert len(frames['AAPL']) == 60
+
+
+def test_calculate_atr_uses_wilder_smoothing(temp_db):
+    import numpy as np
+    import pandas as pd
+
+    df = _daily_bars(['AAPL']).droplevel(0)
+    df.columns = [c.capitalize() for c in df.columns]
+
+    # Reference: Wilder smoothing seeded with the mean of the first 14 TRs
+    true_range = pd.concat([
+        df['High'] - df['Low'],
+        (df['High'] - df['Close'].shift()).abs(),
+        (df['Low'] - df['Close'].shift()).abs()
+    ], axis=1).max(axis=1).to_numpy()
+    expected = true_range[1:15].mean()
+    for tr in true_range[15:]:
+        expected = (expected * 13 + tr) / 14
+
+    ma = MarketAnalyst(temp_db)
+    assert np.isclose(ma._calculate_atr(ma._to_ohlcv(df)), expected)
+    assert ma._calculate_atr(ma._to_ohlcv(df.iloc[:14])) is None
+
+
+def test_calculate_rsi_uses_wilder_smoothing(temp_db):
+    import numpy as np
+
+    df = _daily_bars(['AAPL']).droplevel(0)
+    df.columns = [c.capitalize() for c in df.columns]
+
+    # Reference: Wilder smoothing seeded with the mean of the first 14 changes
+    delta = np.diff(df['Close'].to_numpy())
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain, avg_loss = gain[:14].mean(), loss[:14].mean()
+    for g, l in zip(gain[14:], loss[14:]):
+        avg_gain = (avg_gain * 13 + g) / 14
+        avg_loss = (avg_loss * 13 + l) / 14
+    expected = 100 - 100 / (1 + avg_gain / avg_loss)
+
+    ma = MarketAnalyst(temp_db)
+    assert np.isclose(ma._calculate_rsi(ma._to_ohlcv(df)), expected)
+
+    flat = df.assign(Close=100.0)
+    assert ma._calculate_rsi(ma._to_ohlcv(flat)) is None
+
+
+def test_populate_metadata_skips_existing_and_batches(temp_db, monkeypatch):
+    import agents.market_analyst as market_analyst
+
+    fetched = []
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            fetched.append(symbol)
+            self.info = {'sector': 'Technology', 'industry': 'Software',
+                         'longName': f'{symbol} Inc', 'averageVolume': 500}
+
+    class FakeYF:
+        Ticker = FakeTicker
+
+    monkeypatch.setattr(market_analyst, 'yf', FakeYF, raising=False)
+    monkeypatch.setattr(market_analyst, 'YFINANCE_AVAILABLE', True)
+
+    conn = sqlite3.connect(temp_db)
+    conn.execute("INSERT INTO stock_metadata (symbol, sector) VALUES ('AAPL', 'Technology')")
+    conn.commit()
+    conn.close()
+
+    MarketAnalyst(temp_db).populate_metadata(['AAPL', 'MSFT', 'NVDA', 'MSFT'])
+
+    assert fetched == ['MSFT', 'NVDA']
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute("SELECT symbol, name FROM stock_metadata ORDER BY symbol").fetchall()
+    conn.close()
+    assert rows == [('AAPL', None), ('MSFT', 'MSFT Inc'), ('NVDA', 'NVDA Inc')]
+
+
+def test_fetch_workers_from_config(temp_db):
+    assert MarketAnalyst(temp_db).fetch_workers == 8
+    ma = MarketAnalyst(temp_db, config={'limits': {'market_data_fetch_workers': 0}})
+    assert ma.fetch_workers == 1
+
+
+def test_scan_symbols_keeps_symbol_order(analyst):
+    results = analyst.scan_symbols(['MSFT', 'FAIL', 'AAPL', 'NVDA'])
+    assert list(results) == ['MSFT', 'AAPL', 'NVDA']
+
+
+def test_bar_frames_are_cached_within_ttl(temp_db):
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = _FakeAlpacaClient(['AAPL', 'MSFT'])
+
+    ma.scan_symbols(['AAPL', 'MSFT'])
+    ma.scan_symbols(['AAPL', 'MSFT'])
+    ma.get_market_regime('AAPL')  # reuses the scanned frame
+    ma._fetch_alpaca_data('MSFT')
+
+    assert ma.alpaca_client.requests == [['AAPL', 'MSFT']]
+
+    ma.bar_cache_ttl = 0
+    ma._fetch_alpaca_data('MSFT')
+    assert ma.alpaca_client.requests[-1] == 'MSFT'
+
+
+def test_yfinance_history_is_downloaded_in_one_batch(temp_db, monkeypatch):
+    import pandas as pd
+    import agents.market_analyst as market_analyst
+
+    downloads = []
+
+    class FakeYF:
+        @staticmethod
+        def download(symbols, **kwargs):
+            downloads.append(list(symbols))
+            bars = _daily_bars(['AAPL', 'MSFT'])
+            bars.columns = [c.capitalize() for c in bars.columns]
+            # yf.download(group_by='ticker') layout: columns (ticker, field)
+            return pd.concat({s: bars.loc[s] for s in ['AAPL', 'MSFT']}, axis=1)
+
+        class Ticker:
+            def __init__(self, symbol):
+                raise AssertionError(f"unexpected per-symbol fetch for {symbol}")
+
+    monkeypatch.setattr(market_analyst, 'yf', FakeYF, raising=False)
+    monkeypatch.setattr(market_analyst, 'YFINANCE_AVAILABLE', True)
+
+    results = MarketAnalyst(temp_db).scan_symbols(['AAPL', 'MSFT'])
+
+    assert downloads == [['AAPL', 'MSFT']]
+    assert set(results) == {'AAPL', 'MSFT'}
+    assert results['MSFT']['sma_50'] is not None
+
+
+def test_get_latest_price_uses_epoch_column(analyst, temp_db):
+    import time
+
+    analyst._write_many_to_db({'AAPL': {
+        'price': 187.5, 'source': 'Test',
+        'timestamp': datetime.now().isoformat()
+    }})
+
+    conn = sqlite3.connect(temp_db)
+    ts_epoch = conn.execute("SELECT ts_epoch FROM market_data WHERE symbol = 'AAPL'").fetchone()[0]
+    # Legacy row without ts_epoch is never served from cache
+    conn.execute("INSERT INTO market_data (symbol, price, timestamp) VALUES ('MSFT', 1.0, ?)",
+                 (datetime.now().isoformat(),))
+    conn.commit()
+    conn.close()
+
+    assert abs(ts_epoch - time.time()) < 5
+    assert analyst.get_latest_price('AAPL') == 187.5
+    assert analyst.get_latest_price('MSFT') == 100.0  # refetched via _analyze_symbol
+
+
+def test_latest_price_lookup_uses_symbol_index(analyst, temp_db):
+    analyst.get_latest_price('AAPL')
+
+    conn = sqlite3.connect(temp_db)
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list('market_data')")}
+    plan = conn.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT price, ts_epoch FROM market_data
+        WHERE symbol = 'AAPL' ORDER BY ts_epoch DESC LIMIT 1
+    """).fetchall()
+    conn.close()
+
+    assert {'idx_market_data_symbol', 'idx_market_data_symbol_epoch'} <= indexes
+    assert 'idx_market_data_symbol_epoch' in plan[0][3]
+    assert 'TEMP B-TREE' not in ' '.join(row[3] for row in plan)
+
+
+def test_scan_metrics_include_regime(temp_db):
+    from agents.market_analyst import _classify_regime
+
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = _FakeAlpacaClient(['AAPL', 'MSFT'])
+
+    metrics = ma.scan_symbols(['AAPL', 'MSFT'])['AAPL']
+
+    assert metrics['sma_20'] is not None
+    assert metrics['regime'] == _classify_regime(
+        metrics['price'], metrics['sma_20'], metrics['sma_50'], metrics['atr'])
+    assert ma.get_market_regime('AAPL') == metrics['regime']
+    assert len(ma.alpaca_client.requests) == 1
+
+    assert _classify_regime(100.0, 98.0, 95.0, 1.0) == 'Trending Up'
+    assert _classify_regime(90.0, 92.0, 95.0, 1.0) == 'Trending Down'
+    assert _classify_regime(100.0, 94.0, 95.0, 1.0) == 'Ranging'
+    assert _classify_regime(100.0, 98.0, 95.0, 6.0) == 'High Volatility'
+    assert _classify_regime(100.0, None, 95.0, 1.0) == 'Unknown'
+
+
+def test_quote_fallback_without_price_is_a_miss(temp_db, caplog):
+    class Quote:
+        bid_price = None
+        ask_price = None
+
+    class QuoteClient:
+        def get_stock_latest_quote(self, request):
+            return {'DLST': Quote()}
+
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = QuoteClient()
+
+    assert ma._fetch_alpaca_quote_only('DLST') is None
+    assert not [r for r in caplog.records if r.levelname == 'ERROR']
+
+
+def test_batched_atr_matches_per_symbol(temp_db):
+    import numpy as np
+    from agents.market_analyst import _atr_by_symbol
+
+    bars = _daily_bars(['AAPL', 'MSFT'])
+    bars.columns = [c.capitalize() for c in bars.columns]
+    frames = {
+        'AAPL': bars.loc['AAPL'],
+        'MSFT': bars.loc['MSFT'].iloc[5:],   # different length, own group
+        'NEW': bars.loc['MSFT'].iloc[:10],   # too short for a 14-day ATR
+    }
+
+    atrs = _atr_by_symbol(frames)
+
+    ma = MarketAnalyst(temp_db)
+    assert np.isclose(atrs['AAPL'], ma._calculate_atr(ma._to_ohlcv(frames['AAPL'])))
+    assert np.isclose(atrs['MSFT'], ma._calculate_atr(ma._to_ohlcv(frames['MSFT'])))
+    assert atrs['NEW'] is None
+
+
+def test_call_with_timeout_returns_on_timeout(temp_db):
+    import threading
+    import time
+
+    ma = MarketAnalyst(temp_db)
+    release = threading.Event()
+
+    start = time.monotonic()
+    assert ma._call_with_timeout(release.wait, timeout=0.2) is None
+    elapsed = time.monotonic() - start
+    release.set()
+
+    assert elapsed < 2
+    assert ma._call_with_timeout(lambda: 42) == 42
+    executor = ma._get_api_executor()
+    assert ma._get_api_executor() is executor
+
+    ma.close()
+    assert executor._shutdown
+    assert ma._call_with_timeout(lambda: 7) == 7  # a fresh pool on next use
+    ma.close()
+
+
+def test_scan_fetches_fallback_quotes_in_one_request(temp_db, monkeypatch):
+    import agents.market_analyst as market_analyst
+
+    class Quote:
+        bid_price = 10.0
+        ask_price = 10.2
+
+    class Client(_FakeAlpacaClient):
+        def __init__(self):
+            super().__init__(['AAPL'])
+            self.quote_requests = []
+
+        def get_stock_latest_quote(self, request):
+            self.quote_requests.append(request.symbol_or_symbols)
+            return {symbol: Quote() for symbol in request.symbol_or_symbols if symbol != 'DLST'}
+
+    monkeypatch.setattr(market_analyst, 'YFINANCE_AVAILABLE', False)
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = Client()
+
+    results = ma.scan_symbols(['XYZ', 'AAPL', 'DLST', 'QRS'])
+
+    assert ma.alpaca_client.quote_requests == [['XYZ', 'DLST', 'QRS']]
+    assert list(results) == ['XYZ', 'AAPL', 'QRS']
+    assert results['XYZ']['source'] == 'Alpaca-Quote'
+    assert results['XYZ']['price'] == 10.1
+
+
+def test_bar_cache_evicts_least_recently_used(temp_db, monkeypatch):
+    import pandas as pd
+    import agents.market_analyst as market_analyst
+
+    monkeypatch.setattr(market_analyst, 'BAR_CACHE_MAX_ENTRIES', 2)
+    ma = MarketAnalyst(temp_db)
+    frame = pd.DataFrame({'Close': [1.0]})
+
+    ma._cache_bars('a', frame)
+    ma._cache_bars('b', frame)
+    assert ma._get_cached_bars('a') is frame  # 'b' is now least recent
+    ma._cache_bars('c', frame)
+
+    assert ma._get_cached_bars('b') is None
+    assert ma._get_cached_bars('a') is frame
+    assert ma._get_cached_bars('c') is frame
+
+
+def test_is_trading_day_calls_calendar_once_per_date(temp_db):
+    class TradingClient:
+        calls = 0
+
+        def get_calendar(self, request):
+            TradingClient.calls += 1
+            return []  # holiday
+
+    ma = MarketAnalyst(temp_db)
+    ma.trading_client = TradingClient()
+
+    assert ma.is_trading_day() is False
+    assert ma.is_trading_day() is False
+    assert TradingClient.calls == 1
+
+
+def test_fused_atr_kernel_matches_vectorized():
+    import numpy as np
+    from agents.market_analyst import _wilder_atr, _wilder_atr_fused
+
+    bars = _daily_bars(['AAPL'])
+    high, low, close = (bars[c].to_numpy(dtype=float) for c in ('high', 'low', 'close'))
+
+    assert np.isclose(_wilder_atr_fused(high, low, close, 14), _wilder_atr(high, low, close, 14))
+
+
+def test_streaming_atr_advances_incrementally(temp_db, monkeypatch):
+    import numpy as np
+    import agents.market_analyst as market_analyst
+
+    df = _daily_bars(['AAPL']).droplevel(0)
+    df.columns = [c.capitalize() for c in df.columns]
+    ma = MarketAnalyst(temp_db)
+
+    def streaming(frame):
+        return ma._streaming_atr('AAPL', frame, ma._to_ohlcv(frame))
+
+    def full(frame):
+        return ma._calculate_atr(ma._to_ohlcv(frame))
+
+    # The forming bar can still change intraday
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc('High')] += 5
+    expected = [full(df.iloc[:-1]), full(df), full(revised)]
+
+    assert np.isclose(streaming(df.iloc[:-1]), expected[0])
+
+    # One new bar, then a re-read of the same bars: no full recompute
+    def no_recompute(*args):
+        raise AssertionError("recomputed from scratch")
+
+    monkeypatch.setattr(market_analyst, '_atr', no_recompute)
+    assert np.isclose(streaming(df), expected[1])
+    assert np.isclose(streaming(revised), expected[2])
+
+
+def test_streaming_atr_matches_batch_atr_for_sliding_window(temp_db):
+    import numpy as np
+    from agents.market_analyst import _atr_by_symbol
+
+    df = _daily_bars(['AAPL']).droplevel(0)
+    df.columns = [c.capitalize() for c in df.columns]
+    ma = MarketAnalyst(temp_db)
+
+    # A fixed-length lookback drops its oldest bar as each new one arrives
+    window = len(df) - 5
+    for start in range(5):
+        frame = df.iloc[start:start + window + 1]
+        streamed = ma._streaming_atr('AAPL', frame, ma._to_ohlcv(frame))
+        assert np.isclose(streamed, _atr_by_symbol({'AAPL': frame})['AAPL'])
+
+
+def test_symbols_missing_from_alpaca_fall_back_to_one_yfinance_batch(temp_db, monkeypatch):
+    import pandas as pd
+    import agents.market_analyst as market_analyst
+
+    downloads = []
+
+    class FakeYF:
+        @staticmethod
+        def download(symbols, **kwargs):
+            downloads.append(list(symbols))
+            bars = _daily_bars(['MSFT', 'NVDA'])
+            bars.columns = [c.capitalize() for c in bars.columns]
+            return pd.concat({s: bars.loc[s] for s in ['MSFT', 'NVDA']}, axis=1)
+
+        class Ticker:
+            def __init__(self, symbol):
+                raise AssertionError(f"unexpected per-symbol fetch for {symbol}")
+
+    monkeypatch.setattr(market_analyst, 'yf', FakeYF, raising=False)
+    monkeypatch.setattr(market_analyst, 'YFINANCE_AVAILABLE', True)
+    monkeypatch.setattr(market_analyst, 'YFINANCE_CACHE_AVAILABLE', False)
+    ma = MarketAnalyst(temp_db)
+    ma.alpaca_client = _FakeAlpacaClient(['AAPL'])
+
+    results = ma.scan_symbols(['AAPL', 'MSFT', 'NVDA'])
+
+    assert downloads == [['MSFT', 'NVDA']]
+    assert list(results) == ['AAPL', 'MSFT', 'NVDA']
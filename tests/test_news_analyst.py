@@ -0,0 +1,352 @@
+"""
+Unit Tests for News Analyst Agent
+"""
+
+import json
+import sqlite3
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents import news_analyst
+from src.agents.news_analyst import NewsAnalyst
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Create a local database with the news analysis table."""
+    monkeypatch.setenv('DB_MODE', 'local')
+    db_path = str(tmp_path / 'news.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE news_analysis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            headline TEXT,
+            sentiment TEXT CHECK(sentiment IN ('positive', 'negative', 'neutral')),
+            confidence DECIMAL(3, 2),
+            implied_action TEXT CHECK(implied_action IN ('BUY', 'SELL', 'HOLD')),
+            key_reason TEXT,
+            urgency TEXT CHECK(urgency IN ('high', 'medium', 'low')),
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Session stand-in answering company-news calls per symbol."""
+
+    def __init__(self, by_symbol):
+        self.by_symbol = by_symbol
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        key = params.get('symbol') or params['category']
+        self.calls.append(key)
+        payload = self.by_symbol.get(key)
+        if payload is None:
+            return FakeResponse([], status_code=429)
+        return FakeResponse(payload)
+
+
+def _article(headline, url=None, related='', published=1700000000):
+    return {'headline': headline, 'summary': f'{headline} summary', 'source': 'Wire',
+            'url': url or f'https://news.example/{headline}', 'datetime': published,
+            'related': related}
+
+
+def test_fetch_news_collects_every_symbol_in_order(temp_db):
+    analyst = NewsAnalyst(temp_db, finnhub_key='key',
+                          config={'limits': {'max_news_articles': 2}})
+    analyst._session = FakeSession({
+        'AAPL': [_article('a1'), _article('a2'), _article('a3')],
+        'MSFT': [_article('m1')],
+    })
+
+    news = analyst.fetch_news(['AAPL', 'BAD', 'MSFT'])
+
+    assert sorted(analyst._session.calls) == ['AAPL', 'BAD', 'MSFT']
+    assert [(n['symbol'], n['headline']) for n in news] == [
+        ('AAPL', 'a1'), ('AAPL', 'a2'), ('MSFT', 'm1')
+    ]
+
+
+def test_fetch_news_without_key_skips_requests(temp_db):
+    analyst = NewsAnalyst(temp_db)
+    analyst._session = FakeSession({})
+
+    assert analyst.fetch_news(['AAPL']) == []
+    assert analyst._session.calls == []
+
+
+class FakeModel:
+    """Gemini stand-in recording prompts and answering every article positively."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        self.prompts.append(prompt)
+        entry = {'sentiment': 'positive', 'confidence': 0.8, 'implied_action': 'BUY',
+                 'key_reason': 'beat estimates', 'urgency': 'medium'}
+        count = prompt.count('Headline:')
+        if 'JSON array' in prompt:
+            text = json.dumps([dict(entry, article_index=i + 1) for i in range(count)])
+        else:
+            text = json.dumps(entry)
+        # Streamed in small chunks, like the SDK's iterable response
+        return [Chunk(text[i:i + 16]) for i in range(0, len(text), 16)]
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+@pytest.fixture
+def gemini_analyst(temp_db, monkeypatch):
+    """News analyst with a fake Gemini model and no rate-limit delays."""
+    monkeypatch.setattr(news_analyst, 'call_with_retry', lambda fn, **kwargs: fn())
+    analyst = NewsAnalyst(temp_db)
+    analyst.gemini_model = FakeModel()
+    return analyst
+
+
+def _item(symbol, headline):
+    return {'symbol': symbol, 'headline': headline, 'summary': f'{headline} summary'}
+
+
+def test_repeat_article_is_answered_from_cache(gemini_analyst, temp_db):
+    first = gemini_analyst.analyze_sentiment(_item('AAPL', 'Apple beats'))
+    second = gemini_analyst.analyze_sentiment(_item('AAPL', 'Apple beats'))
+
+    assert len(gemini_analyst.gemini_model.prompts) == 1
+    assert second['sentiment'] == first['sentiment'] == 'positive'
+    assert second['symbol'] == 'AAPL'
+
+    # A fresh instance finds the result in news_sentiment_cache
+    other = NewsAnalyst(temp_db)
+    other.gemini_model = FakeModel()
+    assert other.analyze_sentiment(_item('AAPL', 'Apple beats'))['implied_action'] == 'BUY'
+    assert other.gemini_model.prompts == []
+
+
+def test_batch_sends_only_uncached_articles(gemini_analyst):
+    gemini_analyst.analyze_sentiment(_item('AAPL', 'cached'))
+    items = [_item('AAPL', 'cached'), _item('AAPL', 'new one'), _item('AAPL', 'new two')]
+
+    results = gemini_analyst._analyze_symbol_batch(items)
+
+    assert [r['headline'] for r in results] == ['cached', 'new one', 'new two']
+    batch_prompt = gemini_analyst.gemini_model.prompts[-1]
+    assert 'cached' not in batch_prompt and 'new two' in batch_prompt
+
+    gemini_analyst._analyze_symbol_batch(items)
+    assert len(gemini_analyst.gemini_model.prompts) == 2
+
+
+def test_batch_results_are_written_in_one_commit(gemini_analyst, temp_db, monkeypatch):
+    commits = []
+    monkeypatch.setattr(gemini_analyst, '_write_many_to_db',
+                        lambda analyses, _write=gemini_analyst._write_many_to_db:
+                        (commits.append(len(analyses)), _write(analyses)))
+    items = [_item('MSFT', 'one'), _item('MSFT', 'two'), _item('MSFT', 'three')]
+
+    gemini_analyst._analyze_symbol_batch(items)
+
+    assert commits == [3]
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute("SELECT headline, sentiment, implied_action FROM news_analysis").fetchall()
+    conn.close()
+    assert rows == [('one', 'positive', 'BUY'), ('two', 'positive', 'BUY'),
+                    ('three', 'positive', 'BUY')]
+
+
+def test_analyze_batch_keeps_symbol_order_across_workers(gemini_analyst):
+    gemini_analyst.finnhub_key = 'key'
+    gemini_analyst._session = FakeSession({
+        'AAPL': [_article('a1'), _article('a2')],
+        'MSFT': [_article('m1')],
+        'NVDA': [_article('n1'), _article('n2')],
+    })
+
+    analyses = gemini_analyst.analyze_batch(['AAPL', 'MSFT', 'NVDA'])
+
+    assert [(a['symbol'], a['headline']) for a in analyses] == [
+        ('AAPL', 'a1'), ('AAPL', 'a2'), ('MSFT', 'm1'), ('NVDA', 'n1'), ('NVDA', 'n2')
+    ]
+    assert len(gemini_analyst.gemini_model.prompts) == 3
+
+
+@pytest.mark.parametrize('text', [
+    '{"sentiment": "negative"}',
+    '```json\n{"sentiment": "negative"}\n```',
+    'Here you go:\n```\n{"sentiment": "negative"}\n```\nDone.',
+    '```JSON\n{"sentiment": "negative"}',
+    'Sure! {"sentiment": "negative"} Hope that helps.',
+])
+def test_parse_json_response_handles_fences_and_prose(temp_db, text):
+    analyst = NewsAnalyst(temp_db)
+    assert analyst._parse_json_response(text) == {'sentiment': 'negative'}
+
+
+def test_parse_batch_response_reads_fenced_array(temp_db):
+    analyst = NewsAnalyst(temp_db)
+    text = 'Results:\n```json\n[{"article_index": 1, "sentiment": "negative", "urgency": "high"}]\n```'
+
+    results = analyst._parse_batch_response(text, [_item('TSLA', 'recall')])
+
+    assert results[0]['sentiment'] == 'negative'
+    assert results[0]['urgency'] == 'high'
+
+
+def test_fetch_news_drops_reposted_articles_before_limit(temp_db):
+    analyst = NewsAnalyst(temp_db, finnhub_key='key',
+                          config={'limits': {'max_news_articles': 3}})
+    analyst._session = FakeSession({'AAPL': [
+        _article('Apple beats', url='https://a.example/1'),
+        _article('Apple beats', url='https://b.example/repost'),
+        _article('Other story', url='https://a.example/1'),
+        _article('APPLE BEATS ', url='https://c.example/2'),
+        _article('Guidance raised'),
+        _article('Buyback'),
+    ]})
+
+    news = analyst.fetch_news(['AAPL'])
+
+    assert [n['headline'] for n in news] == ['Apple beats', 'Guidance raised', 'Buyback']
+
+
+def test_reads_return_written_analyses(temp_db):
+    analyst = NewsAnalyst(temp_db)
+    now = news_analyst.datetime.now()
+    earlier = (now - news_analyst.timedelta(minutes=5)).isoformat()
+    now = now.isoformat()
+    analyst._write_many_to_db([
+        {'symbol': 'AMD', 'headline': 'chip deal', 'sentiment': 'Positive', 'confidence': 0.9,
+         'implied_action': 'buy', 'key_reason': 'deal', 'urgency': 'HIGH', 'timestamp': now},
+        {'symbol': 'AMD', 'headline': 'routine', 'sentiment': 'bullish', 'confidence': 0.2,
+         'implied_action': 'hold', 'key_reason': 'filing', 'urgency': 'low', 'timestamp': earlier},
+    ])
+
+    recent = analyst.get_recent_sentiment('amd')
+    urgent = analyst.get_high_urgency_news(hours=1)
+
+    assert [r['sentiment'] for r in recent] == ['positive', 'neutral']
+    assert [(u['headline'], u['implied_action']) for u in urgent] == [('chip deal', 'BUY')]
+
+
+@pytest.mark.parametrize('analysis, expected', [
+    ({'sentiment': 'negative', 'implied_action': 'SELL', 'urgency': 'medium'},
+     ('negative', 'SELL', 'medium')),
+    ({'sentiment': ' Negative\n', 'implied_action': ' sell ', 'urgency': 'Medium'},
+     ('negative', 'SELL', 'medium')),
+    ({'sentiment': None, 'implied_action': 1, 'urgency': ['high']},
+     ('neutral', 'HOLD', 'low')),
+    ({}, ('neutral', 'HOLD', 'low')),
+])
+def test_analysis_row_sanitizes_enums(analysis, expected):
+    row = NewsAnalyst._analysis_row(analysis)
+    assert (row[2], row[4], row[6]) == expected
+
+
+def test_news_queries_use_lookup_indexes(temp_db):
+    analyst = NewsAnalyst(temp_db)
+    analyst.get_recent_sentiment('AAPL')
+
+    conn = sqlite3.connect(temp_db)
+    indexes = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'news_analysis'"
+    )}
+    recent_plan = conn.execute(
+        "EXPLAIN QUERY PLAN" + news_analyst._SQL_RECENT_SENTIMENT, ('AAPL', 5)
+    ).fetchall()
+    urgent_plan = conn.execute(
+        "EXPLAIN QUERY PLAN" + news_analyst._SQL_HIGH_URGENCY, ('2024-01-01',)
+    ).fetchall()
+    conn.close()
+
+    assert {'idx_news_symbol', 'idx_news_high_urgency'} <= indexes
+    assert 'idx_news_symbol' in recent_plan[0][3]
+    assert 'TEMP B-TREE' not in ' '.join(row[3] for row in recent_plan)
+    assert 'idx_news_high_urgency' in urgent_plan[0][3]
+
+
+
+def test_read_json_stream_stops_when_value_closes():
+    def chunks():
+        yield Chunk('```json\n{"key_reason": "guides {up}, \\"beats\\"",')
+        yield Chunk(' "tags": ["a]"]} trailing')
+        raise AssertionError('stream read past the closing brace')
+
+    text = news_analyst._read_json_stream(chunks())
+
+    assert json.loads(text.split('\n', 1)[1]) == {
+        'key_reason': 'guides {up}, "beats"', 'tags': ['a]']
+    }
+
+
+@pytest.mark.parametrize('chunks', [
+    ['Analysis [1 article]:\n```json\n', '{"sentiment": "negative"}\n```'],
+    ['Sure! {"sentiment": "negative"} Hope that helps.'],
+])
+def test_read_json_stream_ignores_brackets_in_leading_prose(temp_db, chunks):
+    text = news_analyst._read_json_stream(Chunk(c) for c in chunks)
+
+    assert NewsAnalyst(temp_db)._parse_json_response(text) == {'sentiment': 'negative'}
+
+
+def test_read_json_stream_stops_after_fenced_array_behind_prose(temp_db):
+    chunks = ['Results for [TSLA]:\n```json\n[{"article_index": 1, ',
+              '"sentiment": "negative"}]\n```', ' extra tokens']
+
+    text = news_analyst._read_json_stream(Chunk(c) for c in chunks)
+
+    assert text.endswith('"negative"}]')
+    results = NewsAnalyst(temp_db)._parse_batch_response(text, [_item('TSLA', 'recall')])
+    assert results[0]['sentiment'] == 'negative'
+
+
+def test_read_json_stream_skips_textless_chunks_and_returns_unclosed_text():
+    class Blocked:
+        @property
+        def text(self):
+            raise ValueError('no parts')
+
+    assert news_analyst._read_json_stream([Chunk('[{"a": 1}'), Blocked(), Chunk(', ')]) == '[{"a": 1}, '
+
+
+
+def test_firehose_mode_filters_general_feed_and_backfills_untagged(temp_db):
+    now = int(news_analyst.time.time())
+    analyst = NewsAnalyst(temp_db, finnhub_key='key', config={'news': {'mode': 'firehose'}})
+    analyst._session = FakeSession({
+        'general': [
+            _article('chips rally', related='NVDA,amd', published=now),
+            _article('old story', related='NVDA', published=now - 3 * 86400),
+            _article('macro', related='', published=now),
+        ],
+        'TSLA': [_article('t1')],
+    })
+
+    news = analyst.fetch_news(['NVDA', 'AMD', 'TSLA'])
+
+    assert sorted(analyst._session.calls) == ['TSLA', 'general']
+    assert [(n['symbol'], n['headline']) for n in news] == [
+        ('NVDA', 'chips rally'), ('AMD', 'chips rally'), ('TSLA', 't1')
+    ]